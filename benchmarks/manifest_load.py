@@ -0,0 +1,86 @@
+"""Time `load_manifest` on a generated multi-thousand-resource manifest.
+
+Each measurement runs in a fresh interpreter, like a real `novps apps apply`, so the
+"warm" numbers show what the on-disk compiled-manifest cache saves across CLI runs.
+
+    python benchmarks/manifest_load.py [--resources 5000] [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+LOAD = """
+import time
+start = time.perf_counter()
+from novps.manifest import load_manifest
+manifest = load_manifest({path!r}, env={{"TAG": "1.2.3", "REGION": "eu"}})
+print(time.perf_counter() - start, len(manifest["resources"]))
+"""
+
+
+def write_manifest(path: Path, resources: int) -> None:
+    with path.open("w") as f:
+        f.write("envs:\n  - key: REGION\n    value: ${REGION}\n")
+        f.write("resources:\n")
+        for i in range(resources):
+            f.write(
+                f"  - name: svc-{i}\n"
+                "    type: web-app\n"
+                "    source:\n"
+                "      type: docker\n"
+                f"      image: registry.example.com/team/svc-{i}:${{TAG}}\n"
+                "    replicas:\n"
+                "      size: sm\n"
+                "      count: 2\n"
+                "    envs:\n"
+                f"      - key: SERVICE_NAME\n        value: svc-{i}-${{REGION:-us}}\n"
+                "      - key: LOG_LEVEL\n        value: info\n"
+                "    internal_ports: [8080, 9090]\n"
+            )
+
+
+def run(path: Path, home: Path) -> float:
+    env = {**os.environ, "HOME": str(home), "PYTHONPATH": str(SRC)}
+    out = subprocess.run(
+        [sys.executable, "-c", LOAD.format(path=str(path))], env=env, check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(out[0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="novps-bench-"))
+    try:
+        manifest = workdir / "manifest.yaml"
+        write_manifest(manifest, args.resources)
+        home = workdir / "home"
+        size = manifest.stat().st_size
+        print(f"{args.resources} resources, {size / 1024 / 1024:.1f} MiB of YAML, {args.runs} run(s) each")
+
+        cold = []
+        for _ in range(args.runs):
+            shutil.rmtree(home / ".novps", ignore_errors=True)
+            cold.append(run(manifest, home))
+        warm = [run(manifest, home) for _ in range(args.runs)]
+
+        for label, samples in (("cold (parse + compile)", cold), ("warm (cached compile)", warm)):
+            samples.sort()
+            print(f"{label:24} median {samples[len(samples) // 2]:.3f}s  min {samples[0]:.3f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
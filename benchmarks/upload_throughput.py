@@ -0,0 +1,190 @@
+"""Measure upload throughput and client CPU per GiB against a local pre-signed URL stand-in.
+
+The sink plays the object store: it reads each PUT body to the end and answers 200
+with an ETag. It runs in its own process, so the CPU time reported here is the
+client's alone; the API calls that open and complete a multipart upload are answered
+in-process. Each run drives the CLI's Rich progress bar like `storage files upload`
+does (run it in a terminal to keep the bar live).
+
+A file up to --part-size takes the single-PUT path, a larger one the multipart path,
+as in the CLI. Both are compared with the bodies they replaced: a 1 MiB read() loop
+reporting progress per chunk, and parts read with os.pread and sent as bytes.
+
+    python benchmarks/upload_throughput.py [--size 256] [--part-size 64] [--runs 3] [--verify]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from novps.commands.storage import _transfer_progress
+from novps.transfer import (
+    DEFAULT_PART_SIZE,
+    DEFAULT_WORKERS,
+    MIB,
+    ProgressCallback,
+    _put_part,
+    put_file,
+    run_parallel,
+    upload_multipart,
+)
+
+SINK = r"""
+import socket, sys, threading
+
+def handle(conn):
+    f = conn.makefile("rb")
+    while True:
+        head = b""
+        while not head.endswith(b"\r\n\r\n"):
+            line = f.readline()
+            if not line:
+                return
+            head += line
+        length = 0
+        for line in head.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        while length:
+            length -= len(f.read1(min(length, 1 << 20)))
+        conn.sendall(b'HTTP/1.1 200 OK\r\nETag: "etag"\r\nContent-Length: 0\r\n\r\n')
+
+sock = socket.socket()
+sock.bind(("127.0.0.1", 0))
+sock.listen()
+print(sock.getsockname()[1], flush=True)
+while True:
+    conn, _ = sock.accept()
+    threading.Thread(target=handle, args=(conn,), daemon=True).start()
+"""
+
+
+class StandInAPI:
+    """Answers the multipart API calls with part URLs on the sink."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+    def post_optional(self, path: str, data: dict[str, Any] | None = None) -> Any:
+        return {"data": {"upload_id": "bench"}}
+
+    def post(self, path: str, data: dict[str, Any] | None = None) -> Any:
+        if path.endswith("/multipart/parts"):
+            return {"data": {"parts": [{"upload_url": f"{self.url}?part={data['part_numbers'][0]}"}]}}
+        return {"data": {}}
+
+
+def read_loop(path: Path, on_progress: ProgressCallback, md5: bool) -> Iterator[bytes]:
+    """The single-PUT body before mmap slices: 1 MiB reads, one progress update each."""
+    digest = hashlib.md5() if md5 else None
+    with path.open("rb") as f:
+        while chunk := f.read(MIB):
+            if digest is not None:
+                digest.update(chunk)
+            on_progress(len(chunk))
+            yield chunk
+
+
+def pread_multipart(http: httpx.Client, url: str, path: Path, part_size: int, workers: int,
+                    on_progress: ProgressCallback, verify: bool) -> None:
+    """The multipart body before mmap slices: each part read with os.pread and sent as bytes."""
+    size = path.stat().st_size
+
+    def upload(number: int) -> None:
+        offset = (number - 1) * part_size
+        with path.open("rb") as f:
+            data = os.pread(f.fileno(), min(part_size, size - offset), offset)
+        _put_part(http, url, data, on_progress, verify=verify)
+
+    run_parallel(upload, list(range(1, -(-size // part_size) + 1)), workers)
+
+
+def write_file(path: Path, size: int) -> None:
+    with path.open("wb") as f:
+        for _ in range(size // MIB):
+            f.write(os.urandom(MIB))
+
+
+def measure(upload: Callable[[ProgressCallback], None], size: int) -> tuple[float, float]:
+    progress = _transfer_progress("Uploading")
+    with progress:
+        task_id = progress.add_task("bench", total=size)
+        wall, cpu = time.perf_counter(), time.process_time()
+        upload(lambda n: progress.update(task_id, advance=n))
+        return time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=256, help="File size in MiB.")
+    parser.add_argument("--part-size", type=int, default=DEFAULT_PART_SIZE // MIB, help="As in `files upload`.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="As in `files upload`.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--verify", action="store_true", help="Also compute MD5s, as `files upload --verify`.")
+    args = parser.parse_args()
+
+    sink = subprocess.Popen([sys.executable, "-c", SINK], stdout=subprocess.PIPE, text=True)
+    workdir = Path(tempfile.mkdtemp(prefix="novps-bench-"))
+    try:
+        url = f"http://127.0.0.1:{sink.stdout.readline().strip()}/object"
+        path = workdir / "upload.bin"
+        write_file(path, args.size * MIB)
+        size = path.stat().st_size
+        part_size = args.part_size * MIB
+        on_verified = (lambda algorithm: None) if args.verify else None
+
+        with httpx.Client(timeout=None) as http:
+            if size > part_size:
+                mode = f"multipart, {args.part_size} MiB parts, {args.workers} workers"
+                api = StandInAPI(url)
+                variants: dict[str, Callable[[ProgressCallback], None]] = {
+                    "pread parts": lambda cb: pread_multipart(
+                        http, url, path, part_size, args.workers, cb, args.verify
+                    ),
+                    "mmap parts": lambda cb: upload_multipart(
+                        api, http, "bench", "object", path, lambda: url,
+                        part_size=part_size, workers=args.workers, on_progress=cb, on_verified=on_verified,
+                    ),
+                }
+            else:
+                mode = "single PUT"
+                headers = {"Content-Length": str(size)}
+                variants = {
+                    "read() loop": lambda cb: http.put(
+                        url, content=read_loop(path, cb, args.verify), headers=headers
+                    ).raise_for_status(),
+                    "mmap body": lambda cb: put_file(http, lambda: url, path, on_progress=cb, on_verified=on_verified),
+                }
+
+            results = {}
+            for label, upload in variants.items():
+                measure(upload, size)  # warm the page cache and the connections
+                samples = sorted(measure(upload, size) for _ in range(args.runs))
+                results[label] = samples[len(samples) // 2]
+
+        print(f"{size / MIB:.0f} MiB file, {mode}, median of {args.runs} run(s)"
+              f"{', with MD5' if args.verify else ''}:")
+        for label, (wall, cpu) in results.items():
+            print(f"  {label:12} {wall:6.2f}s  {size / MIB / wall:7.0f} MiB/s  {cpu / (size / 1024 ** 3):.2f} CPU s/GiB")
+    finally:
+        sink.kill()
+        for p in workdir.iterdir():
+            p.unlink()
+        workdir.rmdir()
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,10 @@ def _format_validation_error(err: Any) -> str:
     return f"{loc}: {msg}{suffix}" if loc else f"{msg}{suffix}"
 
 
+class TransientError(Exception):
+    """A request that may succeed if repeated: a transport error, 429 or a 5xx response."""
+
+
 class NoVPSClient:
     def __init__(self, token: str, base_url: str) -> None:
         self._client = httpx.Client(
@@ -45,6 +49,14 @@ class NoVPSClient:
     def post(self, path: str, data: dict[str, Any] | None = None) -> Any:
         return self._request("POST", path, json=data)
 
+    def post_optional(self, path: str, data: dict[str, Any] | None = None) -> Any | None:
+        """POST to an endpoint not every API version has; returns None if the server answers 404/405."""
+        return self._request("POST", path, missing_ok=True, json=data)
+
+    def post_retryable(self, path: str, data: dict[str, Any] | None = None) -> Any:
+        """POST like `post`, but raise TransientError (without printing) on failures worth retrying."""
+        return self._request("POST", path, transient=True, json=data)
+
     def patch(self, path: str, data: dict[str, Any] | None = None) -> Any:
         return self._request("PATCH", path, json=data)
 
@@ -54,18 +66,30 @@ class NoVPSClient:
     def delete(self, path: str) -> Any:
         return self._request("DELETE", path)
 
-    def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+    def _request(
+        self, method: str, path: str, *, missing_ok: bool = False, transient: bool = False, **kwargs: Any
+    ) -> Any:
         try:
             resp = self._client.request(method, path, **kwargs)
-        except httpx.ConnectError:
+        except httpx.TransportError as e:
+            if transient:
+                raise TransientError(f"{e.__class__.__name__} ({method} {self._client.base_url}{path})") from e
+            if not isinstance(e, httpx.ConnectError):
+                raise
             raise typer.Exit(
                 code=1,
             ) from None
 
+        if transient and (resp.status_code == 429 or resp.status_code >= 500):
+            raise TransientError(f"API returned {resp.status_code} ({method} {self._client.base_url}{path})")
+
         if resp.status_code == 401:
             typer.echo("Error: Authentication failed. Run 'novps auth login' to re-authenticate.", err=True)
             raise typer.Exit(code=1)
 
+        if missing_ok and resp.status_code in (404, 405):
+            return None
+
         if resp.status_code >= 400:
             typer.echo(f"Error: API returned {resp.status_code} ({method} {self._client.base_url}{path})", err=True)
             try:
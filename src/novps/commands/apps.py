@@ -2,14 +2,27 @@ from __future__ import annotations
 
 import sys
 import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import httpx
 import typer
-import yaml
+from rich.console import Console
 
 from novps.client import get_client
-from novps.manifest import ManifestError, load_manifest, resource_names
-from novps.output import console, output, print_json
+from novps.manifest import (
+    ManifestError,
+    changed_subset,
+    clear_apply_state,
+    dump_manifest,
+    load_apply_state,
+    load_manifests,
+    manifest_digests,
+    resource_names,
+    save_apply_state,
+)
+from novps.output import console, err_console, output, print_json
 
 app = typer.Typer(no_args_is_help=True)
 
@@ -33,6 +46,13 @@ RESOURCE_COLUMNS = [
     ("schedule", "Schedule"),
 ]
 
+FLEET_COLUMNS = [
+    ("id", "ID"),
+    ("name", "Name"),
+    ("deployment_id", "Deployment"),
+    ("status", "Status"),
+]
+
 
 @app.command("list")
 def list_apps(
@@ -109,20 +129,178 @@ def delete_app(
     typer.echo(f"Application {app_id} deleted.")
 
 
+def _parse_selector(value: str) -> dict[str, str]:
+    labels: dict[str, str] = {}
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" not in part:
+            raise typer.BadParameter(f"Expected KEY=VALUE in selector, got: {part}")
+        key, val = part.split("=", 1)
+        labels[key.strip()] = val.strip()
+    if not labels:
+        raise typer.BadParameter("Selector is empty.")
+    return labels
+
+
+def _resolve_fleet(client, targets: list[str], selector: str | None) -> list[dict]:
+    """Resolve app IDs, names and a label selector into a de-duplicated list of apps."""
+    apps_list = client.get("/apps").get("data", []) or []
+    by_id = {str(a.get("id")): a for a in apps_list}
+    by_name = {a.get("name"): a for a in apps_list}
+
+    resolved: list[dict] = []
+    seen: set[str] = set()
+
+    def add(a: dict) -> None:
+        aid = str(a.get("id"))
+        if aid not in seen:
+            seen.add(aid)
+            resolved.append(a)
+
+    for target in targets:
+        a = by_id.get(target) or by_name.get(target)
+        if a is None:
+            typer.echo(f"Error: application '{target}' not found.", err=True)
+            raise typer.Exit(code=1)
+        add(a)
+
+    if selector:
+        labels = _parse_selector(selector)
+        for a in apps_list:
+            app_labels = a.get("labels") or {}
+            if all(app_labels.get(k) == v for k, v in labels.items()):
+                add(a)
+
+    return resolved
+
+
+def _deploy_one(client, app: dict, wait: bool, out: Console) -> dict:
+    app_id = str(app.get("id"))
+    result = {"id": app_id, "name": app.get("name"), "deployment_id": None, "status": "failed"}
+    try:
+        data = client.post(f"/apps/{app_id}/deployment", data={}).get("data", {})
+        result["deployment_id"] = data.get("id")
+        result["status"] = data.get("status") or "queued"
+        if wait and result["deployment_id"]:
+            result["status"] = _wait_for_deployment(
+                client, app_id, result["deployment_id"], label=result["name"] or app_id, out=out
+            )
+    except typer.Exit:
+        # The client already reported the API error on stderr.
+        result["status"] = "failed"
+    except httpx.HTTPError as e:
+        # e.g. a read timeout: fail this app instead of aborting the whole fleet.
+        typer.echo(f"Error: {result['name'] or app_id}: {e.__class__.__name__}: {e}", err=True)
+        result["status"] = "failed"
+    return result
+
+
+def _fleet_failed(result: dict, wait: bool) -> bool:
+    if wait:
+        return result["status"] != "success"
+    return result["status"] in ("failed", "skipped")
+
+
+def _deploy_fleet(
+    client,
+    fleet: list[dict],
+    *,
+    wave_size: int,
+    max_in_flight: int,
+    max_failure_ratio: float,
+    wait: bool,
+    out: Console = console,
+) -> list[dict]:
+    """Deploy `fleet` in waves of `wave_size`, at most `max_in_flight` at a time.
+
+    Waves run one after another; once the failure ratio over all finished apps
+    exceeds `max_failure_ratio`, the remaining apps are marked as skipped.
+    Progress lines go to `out`.
+    """
+    results: list[dict] = []
+    failed = 0
+    waves = [fleet[i:i + wave_size] for i in range(0, len(fleet), wave_size)]
+    for index, wave in enumerate(waves, start=1):
+        if results and failed / len(results) > max_failure_ratio:
+            for a in (a for w in waves[index - 1:] for a in w):
+                results.append({"id": str(a.get("id")), "name": a.get("name"), "deployment_id": None,
+                                "status": "skipped"})
+            break
+        out.print(f"[bold]Wave {index}/{len(waves)}[/bold]: {', '.join(str(a.get('name')) for a in wave)}")
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            wave_results = list(pool.map(lambda a: _deploy_one(client, a, wait, out), wave))
+        failed += sum(1 for r in wave_results if _fleet_failed(r, wait))
+        results.extend(wave_results)
+    return results
+
+
 @app.command("deploy")
 def deploy_app(
-    app_id: str = typer.Argument(help="Application ID."),
+    app_ids: list[str] = typer.Argument(None, help="Application IDs or names (several for a fleet deploy)."),
+    selector: str | None = typer.Option(
+        None, "--selector", "-l", help="Label selector, e.g. tier=web,env=prod (adds matching apps)."
+    ),
+    wave_size: int | None = typer.Option(None, "--wave-size", min=1, help="Apps per rollout wave (default: all)."),
+    max_in_flight: int = typer.Option(5, "--max-in-flight", min=1, help="Max concurrent deployments per wave."),
+    max_failure_ratio: float = typer.Option(
+        0.0, "--max-failure-ratio", min=0.0, max=1.0, help="Stop later waves once this failure ratio is exceeded."
+    ),
+    wait: bool = typer.Option(False, "--wait", "-w", help="Wait for the deployment(s) to finish."),
     json: bool = typer.Option(False, "--json", help="Output as JSON."),
     project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
-    """Trigger a manual deployment for the application."""
+    """Trigger a manual deployment for one application or a fleet of them."""
+    app_ids = app_ids or []
+    if not app_ids and not selector:
+        typer.echo("Error: provide at least one application or --selector.", err=True)
+        raise typer.Exit(code=1)
+
     client = get_client(project)
-    resp = client.post(f"/apps/{app_id}/deployment", data={})
-    data = resp.get("data", {})
-    if json:
-        print_json(data)
+    # Keep stdout parseable with --json: progress goes to stderr instead.
+    out = err_console if json else console
+
+    if len(app_ids) == 1 and not selector and wave_size is None:
+        app_id = str(_resolve_fleet(client, app_ids, None)[0].get("id"))
+        resp = client.post(f"/apps/{app_id}/deployment", data={})
+        data = resp.get("data", {})
+        status = None
+        if wait and data.get("id"):
+            status = _wait_for_deployment(client, app_id, data["id"], out=out)
+            data = {**data, "status": status}
+        if json:
+            print_json(data)
+        else:
+            typer.echo(f"Deployment queued: {data.get('id')} (status: {data.get('status')})")
+        if status is not None and status != "success":
+            raise typer.Exit(code=1)
         return
-    typer.echo(f"Deployment queued: {data.get('id')} (status: {data.get('status')})")
+
+    fleet = _resolve_fleet(client, app_ids, selector)
+    if not fleet:
+        typer.echo("Error: no applications matched.", err=True)
+        raise typer.Exit(code=1)
+
+    # Waves only make sense when each one is awaited before the next starts.
+    wait = wait or wave_size is not None
+    results = _deploy_fleet(
+        client,
+        fleet,
+        wave_size=wave_size or len(fleet),
+        max_in_flight=max_in_flight,
+        max_failure_ratio=max_failure_ratio,
+        wait=wait,
+        out=out,
+    )
+
+    if json:
+        print_json(results)
+    else:
+        output(results, FLEET_COLUMNS, title="Deployments")
+
+    if any(_fleet_failed(r, wait) for r in results):
+        raise typer.Exit(code=1)
 
 
 def _has_github_source(manifest: dict) -> bool:
@@ -144,15 +322,18 @@ def _ensure_github_connected(client) -> None:
         raise typer.Exit(code=1)
 
 
-def _wait_for_deployment(client, app_id: str, deployment_id: str) -> str:
+def _wait_for_deployment(
+    client, app_id: str, deployment_id: str, label: str | None = None, out: Console = console
+) -> str:
     start = time.time()
     last_status = ""
+    prefix = f"{label}: " if label else ""
     while time.time() - start < _DEPLOYMENT_POLL_TIMEOUT:
         resp = client.get(f"/apps/{app_id}/deployments/{deployment_id}")
         data = resp.get("data", {})
         status = data.get("status", "")
         if status != last_status:
-            console.print(f"[dim]deployment status: {status}[/dim]")
+            out.print(f"[dim]{prefix}deployment status: {status}[/dim]")
             last_status = status
         if status in _DEPLOYMENT_TERMINAL_STATUSES:
             return status
@@ -194,42 +375,51 @@ def _print_endpoints(endpoints: list[dict]) -> None:
             typer.echo("    status: deployed")
 
 
-@app.command("apply")
-def apply_app(
-    app_name: str = typer.Argument(help="Application name (unique per project)."),
-    file: str = typer.Option(..., "--file", "-f", help="Path to the YAML manifest."),
-    env_file: str | None = typer.Option(
-        None, "--env-file", help="Path to a .env file (merged under shell env for ${VAR} substitution)."
-    ),
-    prune: bool = typer.Option(False, "--prune", help="Delete resources in the app that are not in the manifest."),
-    dry_run: bool = typer.Option(False, "--dry-run", help="Parse and validate only, do not call the API."),
-    wait: bool = typer.Option(False, "--wait", "-w", help="Wait for the deployment to finish."),
-    json: bool = typer.Option(False, "--json", help="Output as JSON."),
-    project: str = typer.Option("default", "--project", "-p", help="Project alias."),
-) -> None:
-    """Create or update an application from a YAML manifest."""
-    try:
-        manifest = load_manifest(file, env_file=env_file)
-    except ManifestError as e:
-        typer.echo(f"Error: {e}", err=True)
-        raise typer.Exit(code=1)
-
-    if dry_run:
-        payload = {"app_name": app_name, **manifest}
-        print_json(payload) if json else typer.echo(f"Manifest OK. Resources: {', '.join(resource_names(manifest))}")
-        return
-
-    client = get_client(project)
-
-    if _has_github_source(manifest):
-        _ensure_github_connected(client)
-
-    resp = client.put(f"/apps/{app_name}/apply", data=manifest)
+def _apply_one(
+    client,
+    app_name: str,
+    manifest: dict,
+    *,
+    prune: bool,
+    wait: bool,
+    json: bool,
+    incremental: bool = False,
+    project: str = "default",
+) -> tuple[dict, str | None]:
+    """Apply one manifest document. Returns the JSON result and the final deployment status (if waited).
+
+    With `incremental`, only resources that changed since the last successful apply
+    (per the local state store) are sent; the rest are reported as `skipped`.
+    """
+    payload, skipped = manifest, []
+    state = load_apply_state(project, app_name) if incremental else {}
+    if state:
+        payload, skipped = changed_subset(manifest, state)
+        removed = set(state.get("resources") or {}) - set(resource_names(manifest))
+        unchanged = not payload["resources"] and state.get("envs") == manifest_digests(manifest)["envs"]
+        if unchanged and not (prune and removed):
+            if not json:
+                typer.echo(f"Application {app_name}: no changes.")
+            out = {"app": {"name": app_name}, "deployment_id": None,
+                   "resources": [{"name": n, "action": "skipped"} for n in skipped]}
+            return out, None
+        if not payload["resources"]:
+            # The apply endpoint rejects an empty resource list (minItems 1, see schema.py),
+            # so envs-only changes go out as a full apply rather than an arbitrary subset.
+            typer.echo(
+                f"Application {app_name}: only app envs changed; applying the full manifest "
+                "because the API requires at least one resource.",
+                err=True,
+            )
+            payload, skipped = manifest, []
+
+    resp = client.put(f"/apps/{app_name}/apply", data=payload)
     data = resp.get("data", {})
     app_info = data.get("app", {})
     app_id = app_info.get("id")
     deployment_id = data.get("deployment_id")
     resources_info = data.get("resources", [])
+    resources_info.extend({"name": n, "action": "skipped"} for n in skipped)
 
     if prune and app_id:
         manifest_names = set(resource_names(manifest))
@@ -255,20 +445,106 @@ def apply_app(
         if deployment_status == "success":
             endpoints = _collect_endpoints(client, resources_info)
 
-    if json:
-        out = {**data, "resources": resources_info}
-        if deployment_status is not None:
-            out["deployment_status"] = deployment_status
+    # Recorded after every apply, not only incremental ones, so a later --incremental run
+    # compares against what the server actually has.
+    if deployment_status in (None, "success"):
+        save_apply_state(project, app_name, manifest)
+    else:
+        clear_apply_state(project, app_name)
+
+    out = {**data, "resources": resources_info}
+    if deployment_status is not None:
+        out["deployment_status"] = deployment_status
+    if endpoints is not None:
+        out["endpoints"] = endpoints
+
+    if not json:
         if endpoints is not None:
-            out["endpoints"] = endpoints
-        print_json(out)
-    elif endpoints is not None:
-        typer.echo("Deployment succeeded.")
-        _print_endpoints(endpoints)
-
-    if deployment_status is not None and deployment_status != "success":
-        if not json:
+            typer.echo("Deployment succeeded.")
+            _print_endpoints(endpoints)
+        if deployment_status is not None and deployment_status != "success":
             typer.echo(f"Deployment finished with status: {deployment_status}", err=True)
+
+    return out, deployment_status
+
+
+def _named_documents(
+    documents: Iterable[tuple[str | None, dict]], app_name: str | None
+) -> Iterator[tuple[str, dict]]:
+    """Resolve each manifest document's app name, rejecting unnamed and duplicate apps."""
+    seen: set[str] = set()
+    for doc_app, manifest in documents:
+        name = doc_app or app_name
+        if not name:
+            raise ManifestError("No application name: pass APP_NAME or set 'app:' in each manifest document")
+        if name in seen:
+            raise ManifestError(f"Application '{name}' appears in more than one manifest document")
+        seen.add(name)
+        yield name, manifest
+
+
+@app.command("apply")
+def apply_app(
+    app_name: str | None = typer.Argument(
+        None, help="Application name (unique per project). Optional when each manifest document sets 'app:'."
+    ),
+    file: str = typer.Option(..., "--file", "-f", help="Path to the YAML manifest (may contain several documents)."),
+    env_file: str | None = typer.Option(
+        None, "--env-file", help="Path to a .env file (merged under shell env for ${VAR} substitution)."
+    ),
+    prune: bool = typer.Option(False, "--prune", help="Delete resources in the app that are not in the manifest."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Parse and validate only, do not call the API."),
+    skip_validation: bool = typer.Option(
+        False, "--skip-validation", help="Skip the local schema check and let the API validate the manifest."
+    ),
+    incremental: bool = typer.Option(
+        False, "--incremental", help="Send only resources changed since the last apply from this machine."
+    ),
+    wait: bool = typer.Option(False, "--wait", "-w", help="Wait for the deployment to finish."),
+    json: bool = typer.Option(False, "--json", help="Output as JSON."),
+    project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Create or update one or more applications from a YAML manifest."""
+    client = None
+    results: list[dict] = []
+    failed = False
+    github_checked = False
+
+    try:
+        documents: Iterable[tuple[str, dict]] = _named_documents(
+            load_manifests(file, env_file=env_file, validate=not skip_validation), app_name
+        )
+        if not dry_run:
+            # Parse and validate every document before the first API call, so an error in
+            # a later document does not leave the earlier apps applied (or pruned).
+            documents = list(documents)
+        for name, manifest in documents:
+            if dry_run:
+                results.append({"app_name": name, **manifest})
+                if not json:
+                    typer.echo(f"Manifest OK ({name}). Resources: {', '.join(resource_names(manifest))}")
+                continue
+
+            if client is None:
+                client = get_client(project)
+            if not github_checked and _has_github_source(manifest):
+                _ensure_github_connected(client)
+                github_checked = True
+
+            out, deployment_status = _apply_one(
+                client, name, manifest, prune=prune, wait=wait, json=json, incremental=incremental, project=project
+            )
+            results.append(out)
+            if deployment_status is not None and deployment_status != "success":
+                failed = True
+    except ManifestError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
+
+    if json:
+        print_json(results[0] if len(results) == 1 else results)
+
+    if failed:
         raise typer.Exit(code=1)
 
 
@@ -290,7 +566,7 @@ def export_app(
     data = resp.get("data", {})
 
     manifest = {"envs": data.get("envs", []), "resources": data.get("resources", [])}
-    yaml_text = yaml.safe_dump(manifest, sort_keys=False, default_flow_style=False, allow_unicode=True)
+    yaml_text = dump_manifest(manifest)
 
     if output_file:
         Path(output_file).write_text(yaml_text)
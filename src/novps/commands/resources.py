@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import os
 import re
 import select
@@ -27,6 +28,7 @@ app = typer.Typer(no_args_is_help=True)
 DURATION_PATTERN = re.compile(r"^(\d+)([smhd])$")
 DURATION_MULTIPLIERS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
 _POLL_INTERVAL = 3
+_WS_MAX_RECONNECTS = 5
 
 
 @app.command("get")
@@ -149,6 +151,113 @@ def _fetch_logs(
     return _flatten(data.get("result", []))
 
 
+def _print_entries(entries: list[tuple[str, str]]) -> None:
+    for ts_ns, line in entries:
+        typer.echo(f"{_format_ts(ts_ns)}  {line}")
+
+
+def _poll_logs(
+    client,
+    resource_id: str,
+    cursor_ns: str,
+    lines: int,
+    search: str | None,
+    pod: str | None,
+) -> None:
+    while True:
+        time.sleep(_POLL_INTERVAL)
+        new_start = str(int(cursor_ns) + 1)
+        new_end = _now_ns()
+        new_entries = _fetch_logs(
+            client, resource_id, new_start, new_end, lines, "forward", search, pod
+        )
+
+        _print_entries(new_entries)
+
+        if new_entries:
+            cursor_ns = new_entries[-1][0]
+
+
+def _obtain_logs_ticket(
+    client,
+    resource_id: str,
+    start_ns: str,
+    search: str | None,
+    pod: str | None,
+) -> dict | None:
+    """A websocket ticket for a live tail starting at `start_ns`, or None if the API has no log streaming."""
+    payload: dict = {"resource_id": resource_id, "start": start_ns}
+    if search:
+        payload["search"] = search
+    if pod:
+        payload["pod"] = pod
+    resp = client.post_optional("/logs/ticket", data=payload)
+    data = (resp or {}).get("data") or {}
+    if not data.get("ticket") or not data.get("websocket_path"):
+        return None
+    return data
+
+
+async def _stream_logs(
+    client,
+    resource_id: str,
+    cursor_ns: str,
+    search: str | None,
+    pod: str | None,
+) -> str:
+    """Print log lines pushed over the websocket service until interrupted.
+
+    Every (re)connection gets a ticket starting right after the last printed line, and
+    lines at or before that cursor are skipped, so reconnects neither drop nor repeat
+    lines. Returns the cursor to continue polling from if streaming is not available
+    or the connection keeps failing.
+    """
+    ws_base = get_ws_url()
+    ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+    failures = 0
+    while True:
+        try:
+            data = await asyncio.to_thread(
+                _obtain_logs_ticket, client, resource_id, str(int(cursor_ns) + 1), search, pod
+            )
+            if data is None:
+                return cursor_ns
+            async with websockets.connect(
+                ws_base + data["websocket_path"],
+                ssl=ssl_ctx if ws_base.startswith("wss:") else None,
+                additional_headers={"X-Ticket": data["ticket"]},
+            ) as ws:
+                async for message in ws:
+                    try:
+                        payload = json.loads(message)
+                    except ValueError:
+                        continue
+                    if not isinstance(payload, dict):
+                        continue
+                    entries = [e for e in _flatten(payload.get("streams") or []) if int(e[0]) > int(cursor_ns)]
+                    _print_entries(entries)
+                    if entries:
+                        cursor_ns = entries[-1][0]
+                    if dropped := payload.get("dropped_entries"):
+                        typer.echo(f"Warning: the server dropped {len(dropped)} log line(s).", err=True)
+                    failures = 0
+        except websockets.exceptions.InvalidStatus as exc:
+            if exc.response.status_code in (404, 405):
+                return cursor_ns
+        except websockets.exceptions.InvalidURI as exc:
+            typer.echo(f"Warning: {exc}; falling back to polling.", err=True)
+            return cursor_ns
+        except (websockets.exceptions.WebSocketException, OSError, typer.Exit):
+            # Dropped connections and failed handshakes (e.g. a proxy answering the upgrade).
+            # typer.Exit: the ticket request failed (the client already printed why).
+            pass
+        failures += 1
+        if failures > _WS_MAX_RECONNECTS:
+            typer.echo("Log stream keeps disconnecting; falling back to polling.", err=True)
+            return cursor_ns
+        await asyncio.sleep(min(2 ** (failures - 1), 30))
+
+
 @app.command("logs")
 def resource_logs(
     resource_id: str = typer.Argument(help="Resource ID."),
@@ -161,9 +270,17 @@ def resource_logs(
     ),
     search: str | None = typer.Option(None, "--search", help="Filter by substring."),
     pod: str | None = typer.Option(None, "--pod", help="Filter by pod name."),
+    poll: bool = typer.Option(
+        False, "--poll", help=f"With -f, poll every {_POLL_INTERVAL}s instead of streaming over a websocket."
+    ),
     project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
-    """View resource logs."""
+    """View resource logs.
+
+    With --follow, new lines are pushed over the websocket service as they are written,
+    resuming after the last printed line on reconnect. If streaming is unavailable,
+    the API is polled instead.
+    """
     since_seconds = _parse_since(since)
     client = get_client(project)
 
@@ -174,8 +291,7 @@ def resource_logs(
         client, resource_id, start_ns, end_ns, lines, "backward", search, pod
     )
 
-    for ts_ns, line in entries:
-        typer.echo(f"{_format_ts(ts_ns)}  {line}")
+    _print_entries(entries)
 
     if not follow:
         return
@@ -183,19 +299,9 @@ def resource_logs(
     cursor_ns = entries[-1][0] if entries else end_ns
 
     try:
-        while True:
-            time.sleep(_POLL_INTERVAL)
-            new_start = str(int(cursor_ns) + 1)
-            new_end = _now_ns()
-            new_entries = _fetch_logs(
-                client, resource_id, new_start, new_end, lines, "forward", search, pod
-            )
-
-            for ts_ns, line in new_entries:
-                typer.echo(f"{_format_ts(ts_ns)}  {line}")
-
-            if new_entries:
-                cursor_ns = new_entries[-1][0]
+        if not poll:
+            cursor_ns = asyncio.run(_stream_logs(client, resource_id, cursor_ns, search, pod))
+        _poll_logs(client, resource_id, cursor_ns, lines, search, pod)
     except KeyboardInterrupt:
         pass
     except (httpx.RemoteProtocolError, httpx.ConnectError):
@@ -1,17 +1,54 @@
 from __future__ import annotations
 
+import fnmatch
+import hashlib
+import itertools
 import os
+import re
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import httpx
 import typer
-from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TimeElapsedColumn, \
+from rich.progress import BarColumn, DownloadColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn, \
     TransferSpeedColumn
 from rich.table import Table
 
-from novps.client import get_client
-from novps.output import console, output, print_json
+from novps.client import TransientError, get_client
+from novps.config import STATE_DIR
+from novps.index import BucketIndex, BucketIndexError
+from novps.objcache import ObjectCache
+from novps.urlcache import UrlCache, url_expiry
+from novps.output import console, output, print_json, stream_output
+from novps.transfer import (
+    COMPRESSIONS,
+    DEFAULT_PART_SIZE,
+    DEFAULT_WORKERS,
+    MAX_RETRIES,
+    MIB,
+    CompressedReader,
+    TransferError,
+    TransferScheduler,
+    VerifyCallback,
+    download_resumable,
+    download_segmented,
+    download_to_stream,
+    compression_available,
+    etag_matches,
+    copy_object,
+    file_digest,
+    put_file,
+    read_range,
+    retry_delay,
+    run_bounded,
+    upload_multipart,
+    upload_stream,
+)
 
 app = typer.Typer(no_args_is_help=True)
 files_app = typer.Typer(no_args_is_help=True, help="File operations within a bucket.")
@@ -37,6 +74,12 @@ FILE_COLUMNS = [
     ("last_modified", "Last Modified"),
 ]
 
+USAGE_COLUMNS = [
+    ("prefix", "Prefix"),
+    ("objects", "Objects"),
+    ("size", "Size"),
+]
+
 KEY_COLUMNS = [
     ("internal_name", "Key"),
     ("name", "Name"),
@@ -194,6 +237,99 @@ def set_access(
 # ── files ─────────────────────────────────────────────────────────────────
 
 
+def _fetch_page(client, bucket: str, path: str, page_size: int, token: str | None) -> dict[str, Any]:
+    params: dict[str, Any] = {"path": path, "page_size": page_size}
+    if token:
+        params["continuation_token"] = token
+    return client.get(f"/storage/{bucket}/files", params=params).get("data", {}) or {}
+
+
+def _iter_pages(
+        client,
+        bucket: str,
+        path: str,
+        page_size: int = 1000,
+        continuation_token: str | None = None,
+        *,
+        prefetch: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """Yield listing pages of one folder lazily.
+
+    With `prefetch`, the next page is requested while the current one is used; callers
+    that may stop after the first page should turn it off to avoid a wasted request.
+    """
+    if not prefetch:
+        token = continuation_token
+        while True:
+            data = _fetch_page(client, bucket, path, page_size, token)
+            yield data
+            token = data.get("next_continuation_token")
+            if not token:
+                return
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        future: Future | None = pool.submit(_fetch_page, client, bucket, path, page_size, continuation_token)
+        while future is not None:
+            data = future.result()
+            next_token = data.get("next_continuation_token")
+            future = pool.submit(_fetch_page, client, bucket, path, page_size, next_token) if next_token else None
+            yield data
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _walk_remote(
+        client,
+        bucket: str,
+        prefix: str,
+        *,
+        page_size: int = 1000,
+        workers: int = 1,
+        folders: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Yield every file item under `prefix`, descending into folders.
+
+    Pages of different folders are listed by up to `workers` threads, and a folder's
+    next page is requested before the current one is yielded. With `folders`, folder
+    items are yielded too.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    pending: dict[Future, str] = {}
+
+    def submit(path: str, token: str | None) -> None:
+        pending[pool.submit(_fetch_page, client, bucket, path, page_size, token)] = path
+
+    try:
+        submit(prefix, None)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                data = future.result()
+                if next_token := data.get("next_continuation_token"):
+                    submit(path, next_token)
+                for item in data.get("items") or []:
+                    if item.get("type") == "folder":
+                        submit(item.get("key", ""), None)
+                        if not folders:
+                            continue
+                    yield item
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+LIST_FORMATS = ("table", "json", "ndjson", "csv")
+
+
+def _print_files(items: Iterable[dict[str, Any]], fmt: str, title: str) -> None:
+    if fmt == "json":
+        print_json({"items": list(items)})
+        return
+    columns = FILE_COLUMNS if fmt == "table" else [(k, k) for k, _ in FILE_COLUMNS]
+    rows = (_format_file_row(it) for it in items) if fmt == "table" else items
+    stream_output(rows, columns, fmt, title=title)
+
+
 @files_app.command("list")
 def list_files(
         bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
@@ -202,188 +338,1163 @@ def list_files(
         continuation_token: str | None = typer.Option(
             None, "--continuation-token", help="Continuation token from previous page."
         ),
-        fetch_all: bool = typer.Option(False, "--all", help="Fetch all pages and print together."),
-        json: bool = typer.Option(False, "--json", help="Output as JSON."),
+        fetch_all: bool = typer.Option(False, "--all", help="Fetch all pages, streaming rows as they arrive."),
+        recursive: bool = typer.Option(
+            False, "--recursive", "-r", help="List every file under --path, descending into folders."
+        ),
+        workers: int = typer.Option(4, "--workers", min=1, help="Parallel folder listers with -r."),
+        max_items: int | None = typer.Option(None, "--max-items", min=1, help="Stop after this many items."),
+        output_format: str = typer.Option(
+            "table", "--format", help=f"Output format: {', '.join(LIST_FORMATS)}. ndjson/csv stream row by row."
+        ),
+        json: bool = typer.Option(False, "--json", help="Output as JSON (same as --format json)."),
+        cached: bool = typer.Option(False, "--cached", help="Answer from the local index (see `storage index`)."),
         project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
     """List files and folders in a bucket."""
+    fmt = "json" if json else output_format
+    if fmt not in LIST_FORMATS:
+        typer.echo(f"Error: --format must be one of: {', '.join(LIST_FORMATS)}", err=True)
+        raise typer.Exit(code=1)
+
+    if cached:
+        folder = path if not path or path.endswith("/") else path + "/"
+        with _open_index(project, bucket) as idx:
+            items = idx.files(folder) if recursive else idx.children(folder)
+            if max_items is not None:
+                items = itertools.islice(items, max_items)
+            _print_files(items, fmt, title=f"Files in {bucket} (cached)")
+        return
+
     client = get_client(project)
 
-    items: list[dict[str, Any]] = []
-    next_token = continuation_token
-    while True:
-        params: dict[str, Any] = {"path": path, "page_size": page_size}
-        if next_token:
-            params["continuation_token"] = next_token
-        resp = client.get(f"/storage/{bucket}/files", params=params)
-        data = resp.get("data", {})
-        items.extend(data.get("items", []) or [])
-        next_token = data.get("next_continuation_token")
-        if not fetch_all or not next_token:
-            break
+    next_token: str | None = None
 
-    if json:
+    def page_items() -> Iterator[dict[str, Any]]:
+        nonlocal next_token
+        pages = _iter_pages(client, bucket, path, page_size, continuation_token, prefetch=fetch_all)
+        for data in pages if fetch_all else itertools.islice(pages, 1):
+            next_token = data.get("next_continuation_token")
+            yield from data.get("items") or []
+
+    if recursive:
+        items: Iterator[dict[str, Any]] = _walk_remote(client, bucket, path, page_size=page_size, workers=workers)
+    else:
+        items = page_items()
+    if max_items is not None:
+        items = itertools.islice(items, max_items)
+
+    if fmt == "json":
         print_json({
-            "items": items,
+            "items": list(items),
             "next_continuation_token": next_token,
         })
         return
 
-    output([_format_file_row(it) for it in items], FILE_COLUMNS, title=f"Files in {bucket}")
-    if next_token and not fetch_all:
+    _print_files(items, fmt, title=f"Files in {bucket}")
+
+    if fmt == "table" and next_token and not fetch_all and not recursive:
         console.print(
             f"\n[dim]More results available. Use --continuation-token={next_token} "
             f"to fetch the next page, or --all to fetch everything.[/dim]"
         )
 
 
-@files_app.command("upload")
-def upload_file(
+# ── local index ───────────────────────────────────────────────────────────
+
+
+_SIZE_SUFFIXES = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+_AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def _open_index(project: str, bucket: str) -> BucketIndex:
+    try:
+        return BucketIndex.open(project, bucket)
+    except BucketIndexError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1) from e
+
+
+def _parse_size(value: str) -> int:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?", value.strip(), re.IGNORECASE)
+    if not match:
+        typer.echo(f"Error: invalid size '{value}' (examples: 500K, 10M, 1.5G).", err=True)
+        raise typer.Exit(code=1)
+    return int(float(match.group(1)) * _SIZE_SUFFIXES[match.group(2).upper()])
+
+
+def _parse_since(value: str) -> float:
+    """A UNIX timestamp from a relative age (30m, 12h, 7d, 2w) or an ISO date/time."""
+    match = re.fullmatch(r"(\d+)([smhdw])", value.strip())
+    if match:
+        return time.time() - int(match.group(1)) * _AGE_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        typer.echo(f"Error: invalid time '{value}' (examples: 12h, 7d, 2026-01-31).", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command("index")
+def index_bucket(
         bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
-        local_file: Path = typer.Argument(help="Local file to upload.", exists=True, dir_okay=False,
-                                          readable=True),
-        key: str | None = typer.Option(None, "--key", help="Remote key (defaults to the local file name)."),
-        content_type: str | None = typer.Option(None, "--content-type", help="Content-Type header for the object."),
+        prefix: str = typer.Option("", "--prefix", help="Only refresh keys under this prefix."),
+        workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Parallel folder listers."),
         project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
-    """Upload a local file to a bucket using a pre-signed URL."""
+    """Build or refresh a local SQLite index of a bucket's keys, sizes and modification times.
+
+    The index backs `files list --cached`, `files du` and `files find`. Refreshing walks
+    the listing again and only writes keys that were added, changed or removed.
+    """
     client = get_client(project)
+    started = time.monotonic()
+    with BucketIndex.open(project, bucket, create=True) as idx, console.status(f"Indexing {bucket}..."):
+        stats = idx.refresh(_walk_remote(client, bucket, prefix, workers=workers), prefix)
+    typer.echo(
+        f"Indexed {stats['total']} object(s) under {bucket}/{prefix} in {time.monotonic() - started:.1f}s "
+        f"({stats['added']} added, {stats['updated']} updated, {stats['removed']} removed)."
+    )
 
-    remote_key = key or local_file.name
-    metadata: dict[str, Any] = {}
-    if content_type:
-        metadata["ContentType"] = content_type
 
-    resp = client.post(f"/storage/{bucket}/files/upload", data={"key": remote_key, "metadata": metadata})
-    upload_url = (resp.get("data") or {}).get("upload_url")
-    if not upload_url:
-        typer.echo("Error: server did not return an upload URL.", err=True)
+@files_app.command("du")
+def disk_usage(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        prefix: str = typer.Option("", "--prefix", help="Only count keys under this prefix."),
+        depth: int = typer.Option(1, "--depth", min=1, help="Number of path segments to group by."),
+        json: bool = typer.Option(False, "--json", help="Output as JSON."),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Show object count and total size per prefix, from the local index."""
+    with _open_index(project, bucket) as idx:
+        rows = idx.usage(prefix, depth)
+    if json:
+        print_json(rows)
+        return
+    total = {"prefix": "[bold]total[/bold]", "objects": sum(r["objects"] for r in rows),
+             "size": sum(r["size"] for r in rows)}
+    output([{**r, "size": _format_size(r["size"])} for r in [*rows, total]], USAGE_COLUMNS, f"Usage of {bucket}/{prefix}")
+
+
+@files_app.command("find")
+def find_files(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        prefix: str = typer.Option("", "--prefix", help="Only search keys under this prefix."),
+        glob: str | None = typer.Option(None, "--glob", help="Glob matched against the key relative to --prefix (* spans '/')."),
+        newer: str | None = typer.Option(None, "--newer", help="Modified within an age (12h, 7d) or after a date."),
+        larger: str | None = typer.Option(None, "--larger", help="Larger than a size (500K, 10M, 1G)."),
+        output_format: str = typer.Option("table", "--format", help=f"Output format: {', '.join(LIST_FORMATS)}."),
+        json: bool = typer.Option(False, "--json", help="Output as JSON (same as --format json)."),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Find files in the local index by glob, modification time and size."""
+    fmt = "json" if json else output_format
+    if fmt not in LIST_FORMATS:
+        typer.echo(f"Error: --format must be one of: {', '.join(LIST_FORMATS)}", err=True)
         raise typer.Exit(code=1)
+    since = _parse_since(newer) if newer else None
+    min_size = _parse_size(larger) if larger else None
+    with _open_index(project, bucket) as idx:
+        items = idx.files(prefix, glob=glob, newer=since, larger=min_size)
+        _print_files(items, fmt, title=f"Files in {bucket} (cached)")
 
-    file_size = local_file.stat().st_size
 
-    progress = Progress(
-        TextColumn("[bold]Uploading[/bold] {task.description}"),
+def _transfer_progress(verb: str) -> Progress:
+    return Progress(
+        TextColumn(f"[bold]{verb}[/bold] {{task.description}}"),
         BarColumn(),
         DownloadColumn(),
         TransferSpeedColumn(),
         TimeElapsedColumn(),
         console=console,
     )
-    with progress:
-        task_id = progress.add_task(local_file.name, total=file_size)
 
-        def _iter_file():
-            with local_file.open("rb") as f:
-                while True:
-                    chunk = f.read(1024 * 1024)
-                    if not chunk:
-                        break
-                    progress.update(task_id, advance=len(chunk))
-                    yield chunk
 
-        headers = {"Content-Length": str(file_size)}
-        if content_type:
-            headers["Content-Type"] = content_type
+def _scheduler(workers: int, limit_rate: str | None) -> TransferScheduler:
+    return TransferScheduler(max_transfers=workers, limit_rate=_parse_size(limit_rate) if limit_rate else None)
+
+
+def _show_stats(progress: Progress, task_id: Any, label: str) -> Callable[[dict[str, Any]], None]:
+    """A scheduler stats callback that keeps a multi-file progress line up to date."""
+    def update(stats: dict[str, Any]) -> None:
+        progress.update(
+            task_id,
+            description=f"{label} ({stats['done']} done, {stats['active']} active, {stats['queued']} queued)",
+        )
+    return update
+
+
+def _presign_upload(client, bucket: str, key: str, metadata: dict[str, Any]) -> str:
+    resp = client.post(f"/storage/{bucket}/files/upload", data={"key": key, "metadata": metadata})
+    upload_url = (resp.get("data") or {}).get("upload_url")
+    if not upload_url:
+        typer.echo("Error: server did not return an upload URL.", err=True)
+        raise typer.Exit(code=1)
+    return upload_url
+
+
+def _matches(rel: str, include: list[str], exclude: list[str]) -> bool:
+    if include and not any(fnmatch.fnmatchcase(rel, pat) for pat in include):
+        return False
+    return not any(fnmatch.fnmatchcase(rel, pat) for pat in exclude)
+
+
+def _walk_files(root: Path, include: list[str], exclude: list[str]) -> Iterator[tuple[Path, str]]:
+    """Lazily yield `(path, relative posix path)` for files under `root` that pass the globs."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            rel = path.relative_to(root).as_posix()
+            if _matches(rel, include, exclude):
+                yield path, rel
+
+
+def _join_key(prefix: str, rel: str) -> str:
+    if not prefix:
+        return rel
+    return prefix.rstrip("/") + "/" + rel
+
+
+def _verification(verify: bool) -> tuple[list[str | None], VerifyCallback | None]:
+    """A list collecting per-transfer verification results and the callback that fills it."""
+    results: list[str | None] = []
+    return results, results.append if verify else None
 
-        try:
-            with httpx.Client(timeout=None) as http:
-                put_resp = http.put(upload_url, content=_iter_file(), headers=headers)
-        except httpx.HTTPError as e:
-            typer.echo(f"Error: upload failed: {e}", err=True)
-            raise typer.Exit(code=1) from e
 
-    if put_resp.status_code >= 400:
+def _report_verification(results: list[str | None]) -> None:
+    if not results:
+        return
+    unverified = results.count(None)
+    if unverified:
         typer.echo(
-            f"Error: upload failed with status {put_resp.status_code}: {put_resp.text[:200]}",
+            f"Warning: {unverified} of {len(results)} transfer(s) not verified: "
+            "the server returned no usable checksum (e.g. a multipart ETag).",
             err=True,
         )
+    algorithms = sorted({a for a in results if a is not None})
+    if algorithms:
+        typer.echo(f"Verified {len(results) - unverified} transfer(s) ({', '.join(algorithms)}).")
+
+
+def _print_transfer_summary(verb: str, files: int, total_bytes: int, elapsed: float, failed: int) -> None:
+    rate = total_bytes / elapsed if elapsed > 0 else 0
+    summary = (
+        f"{verb} {files} file(s), {_format_size(total_bytes)} in {elapsed:.1f}s "
+        f"({_format_size(rate)}/s, {files / elapsed if elapsed > 0 else 0:.1f} files/s)"
+    )
+    typer.echo(summary)
+    if failed:
+        typer.echo(f"{failed} file(s) failed.", err=True)
+
+
+def _upload_tree(
+        client,
+        bucket: str,
+        root: Path,
+        prefix: str,
+        *,
+        include: list[str],
+        exclude: list[str],
+        content_type: str | None,
+        scheduler: TransferScheduler,
+        verify: bool = False,
+        compress: str | None = None,
+) -> None:
+    metadata: dict[str, Any] = {"ContentType": content_type} if content_type else {}
+    if compress:
+        metadata["ContentEncoding"] = compress
+    verified, on_verified = _verification(verify)
+    uploaded = failed = total_bytes = 0
+    started = time.monotonic()
+
+    progress = _transfer_progress("Uploading")
+    with progress, scheduler.client() as http:
+        task_id = progress.add_task(str(root), total=None)
+        scheduler.on_stats = _show_stats(progress, task_id, str(root))
+
+        def upload(entry: tuple[Path, str]) -> int:
+            path, rel = entry
+            key = _join_key(prefix, rel)
+            if compress:
+                # Files are already uploaded in parallel, so each one streams its parts serially.
+                with path.open("rb") as f:
+                    upload_stream(
+                        client, http, bucket, key, CompressedReader(f, compress),
+                        lambda: _presign_upload(client, bucket, key, metadata),
+                        workers=1,
+                        metadata=metadata,
+                        content_type=content_type,
+                        content_encoding=compress,
+                        on_progress=lambda n: progress.update(task_id, advance=n),
+                        on_verified=on_verified,
+                    )
+                return path.stat().st_size
+            return put_file(
+                http,
+                lambda: _presign_upload(client, bucket, key, metadata),
+                path,
+                content_type=content_type,
+                on_progress=lambda n: progress.update(task_id, advance=n),
+                on_verified=on_verified,
+            )
+
+        entries = _walk_files(root, include, exclude)
+        for (path, _), size, error in scheduler.run(upload, entries, size=lambda e: e[0].stat().st_size):
+            if error is not None:
+                failed += 1
+                if not isinstance(error, typer.Exit):
+                    progress.console.print(f"[red]failed[/red] {path}: {error}")
+                continue
+            uploaded += 1
+            total_bytes += size
+
+    _print_transfer_summary("Uploaded", uploaded, total_bytes, time.monotonic() - started, failed)
+    _report_verification(verified)
+    if failed:
         raise typer.Exit(code=1)
 
-    typer.echo(f"Uploaded {local_file} -> {bucket}/{remote_key}")
 
+def _compression_ratio(reader: CompressedReader) -> str:
+    return f"{reader.encoding}: {_format_size(reader.consumed)} -> {_format_size(reader.produced)}"
 
-@files_app.command("download")
-def download_file(
+
+def _upload_compressed(
+        client,
+        bucket: str,
+        local_file: Path,
+        key: str,
+        *,
+        compress: str,
+        content_type: str | None,
+        part_size: int,
+        scheduler: TransferScheduler,
+        verify: bool,
+) -> None:
+    metadata: dict[str, Any] = {"ContentEncoding": compress}
+    if content_type:
+        metadata["ContentType"] = content_type
+    verified, on_verified = _verification(verify)
+
+    progress = _transfer_progress("Uploading")
+    with progress, local_file.open("rb") as f:
+        reader = CompressedReader(f, compress)
+        # The compressed size is unknown up front, so progress tracks the input consumed.
+        task_id = progress.add_task(local_file.name, total=local_file.stat().st_size)
+        try:
+            with scheduler.client() as http:
+                upload_stream(
+                    client, http, bucket, key, reader,
+                    lambda: _presign_upload(client, bucket, key, metadata),
+                    part_size=part_size,
+                    workers=scheduler.max_transfers,
+                    metadata=metadata,
+                    content_type=content_type,
+                    content_encoding=compress,
+                    on_progress=lambda n: progress.update(task_id, completed=reader.consumed),
+                    on_verified=on_verified,
+                )
+        except TransferError as e:
+            typer.echo(f"Error: upload failed: {e}", err=True)
+            raise typer.Exit(code=1) from e
+    typer.echo(f"Uploaded {local_file} -> {bucket}/{key} ({_compression_ratio(reader)})")
+    _report_verification(verified)
+
+
+def _upload_stdin(
+        client,
+        bucket: str,
+        key: str | None,
+        *,
+        content_type: str | None,
+        part_size: int,
+        scheduler: TransferScheduler,
+        verify: bool = False,
+        compress: str | None = None,
+) -> None:
+    if not key:
+        typer.echo("Error: --key is required when uploading from stdin.", err=True)
+        raise typer.Exit(code=1)
+    metadata: dict[str, Any] = {"ContentType": content_type} if content_type else {}
+    stream: Any = sys.stdin.buffer
+    if compress:
+        metadata["ContentEncoding"] = compress
+        stream = CompressedReader(stream, compress)
+    verified, on_verified = _verification(verify)
+
+    progress = _transfer_progress("Uploading")
+    with progress:
+        task_id = progress.add_task("stdin", total=None)
+        try:
+            with scheduler.client() as http:
+                upload_stream(
+                    client, http, bucket, key, stream,
+                    lambda: _presign_upload(client, bucket, key, metadata),
+                    part_size=part_size,
+                    workers=scheduler.max_transfers,
+                    metadata=metadata,
+                    content_type=content_type,
+                    content_encoding=compress,
+                    on_progress=lambda n: progress.update(task_id, advance=n),
+                    on_verified=on_verified,
+                )
+        except TransferError as e:
+            typer.echo(f"Error: upload failed: {e}", err=True)
+            raise typer.Exit(code=1) from e
+    typer.echo(f"Uploaded stdin -> {bucket}/{key}" + (f" ({_compression_ratio(stream)})" if compress else ""))
+    _report_verification(verified)
+
+
+@files_app.command("upload")
+def upload_file(
         bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
-        key: str = typer.Argument(help="Remote key to download."),
-        output_path: Path | None = typer.Option(
-            None, "--output", "-o", help="Output path (defaults to the key's basename in cwd)."
+        local_file: Path = typer.Argument(help="Local file (or directory with -r) to upload; '-' reads stdin.",
+                                          exists=True, readable=True, allow_dash=True),
+        key: str | None = typer.Option(None, "--key", help="Remote key (defaults to the local file name)."),
+        content_type: str | None = typer.Option(None, "--content-type", help="Content-Type header for the object."),
+        recursive: bool = typer.Option(False, "--recursive", "-r", help="Upload a directory tree."),
+        prefix: str = typer.Option("", "--prefix", help="Key prefix for -r uploads."),
+        include: list[str] = typer.Option([], "--include", help="Glob of relative paths to upload (repeatable)."),
+        exclude: list[str] = typer.Option([], "--exclude", help="Glob of relative paths to skip (repeatable)."),
+        part_size: int = typer.Option(
+            DEFAULT_PART_SIZE // MIB, "--part-size", min=5,
+            help="Multipart part size in MiB; larger files are uploaded in parallel parts.",
         ),
-        duration: int | None = typer.Option(
-            None, "--duration", help="Pre-signed URL lifetime in seconds."
+        workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Parallel part or file uploads."),
+        verify: bool = typer.Option(
+            False, "--verify", help="Check the MD5 of what the server stored (Content-MD5 for multipart parts)."
+        ),
+        compress: str | None = typer.Option(
+            None, "--compress", help=f"Compress while uploading ({', '.join(COMPRESSIONS)}); sets Content-Encoding."
+        ),
+        limit_rate: str | None = typer.Option(
+            None, "--limit-rate", help="Cap total bandwidth in bytes/s across all transfers, e.g. 500K or 10M."
         ),
         project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
-    """Download an object from a bucket using a pre-signed URL."""
+    """Upload a local file to a bucket using pre-signed URLs (multipart for large files).
+
+    With -r, every file under the directory is uploaded as <prefix>/<relative path>
+    by a pool of --workers concurrent uploads, smallest files first.
+    """
+    if compress is not None and compress not in COMPRESSIONS:
+        typer.echo(f"Error: --compress must be one of: {', '.join(COMPRESSIONS)}", err=True)
+        raise typer.Exit(code=1)
+    if compress is not None and not compression_available(compress):
+        typer.echo(f"Error: --compress {compress} requires the 'zstandard' package.", err=True)
+        raise typer.Exit(code=1)
+    if local_file.is_dir() and not recursive:
+        typer.echo(f"Error: {local_file} is a directory; pass -r to upload it recursively.", err=True)
+        raise typer.Exit(code=1)
+    if recursive and not local_file.is_dir():
+        typer.echo(f"Error: -r expects a directory, got {local_file}.", err=True)
+        raise typer.Exit(code=1)
+
+    scheduler = _scheduler(workers, limit_rate)
     client = get_client(project)
+
+    if str(local_file) == "-":
+        _upload_stdin(client, bucket, key, content_type=content_type, part_size=part_size * MIB, scheduler=scheduler,
+                      verify=verify, compress=compress)
+        return
+
+    if recursive:
+        _upload_tree(
+            client, bucket, local_file, prefix,
+            include=include, exclude=exclude, content_type=content_type, scheduler=scheduler, verify=verify,
+            compress=compress,
+        )
+        return
+
+    remote_key = key or local_file.name
+    if compress:
+        _upload_compressed(
+            client, bucket, local_file, remote_key,
+            compress=compress, content_type=content_type, part_size=part_size * MIB, scheduler=scheduler,
+            verify=verify,
+        )
+        return
+    metadata: dict[str, Any] = {}
+    if content_type:
+        metadata["ContentType"] = content_type
+
+    file_size = local_file.stat().st_size
+    verified, on_verified = _verification(verify)
+
+    if file_size > part_size * MIB:
+        progress = _transfer_progress("Uploading")
+        with progress:
+            task_id = progress.add_task(local_file.name, total=file_size)
+            try:
+                with scheduler.client() as http:
+                    upload_multipart(
+                        client, http, bucket, remote_key, local_file,
+                        lambda: _presign_upload(client, bucket, remote_key, metadata),
+                        part_size=part_size * MIB,
+                        workers=workers,
+                        metadata=metadata,
+                        on_progress=lambda n: progress.update(task_id, advance=n),
+                        on_verified=on_verified,
+                    )
+            except TransferError as e:
+                typer.echo(f"Error: upload failed: {e}", err=True)
+                raise typer.Exit(code=1) from e
+        typer.echo(f"Uploaded {local_file} -> {bucket}/{remote_key}")
+        _report_verification(verified)
+        return
+
+    progress = _transfer_progress("Uploading")
+    with progress:
+        task_id = progress.add_task(local_file.name, total=file_size)
+        try:
+            with scheduler.client() as http:
+                put_file(
+                    http,
+                    lambda: _presign_upload(client, bucket, remote_key, metadata),
+                    local_file,
+                    content_type=content_type,
+                    on_progress=lambda n: progress.update(task_id, advance=n),
+                    on_verified=on_verified,
+                )
+        except TransferError as e:
+            typer.echo(f"Error: upload failed: {e}", err=True)
+            raise typer.Exit(code=1) from e
+
+    typer.echo(f"Uploaded {local_file} -> {bucket}/{remote_key}")
+    _report_verification(verified)
+
+
+def _presign_download(client, bucket: str, key: str, duration: int | None = None) -> str:
     body: dict[str, Any] = {"key": key}
     if duration is not None:
         body["duration"] = duration
-
     resp = client.post(f"/storage/{bucket}/files/download", data=body)
     download_url = (resp.get("data") or {}).get("upload_url")
     if not download_url:
         typer.echo("Error: server did not return a download URL.", err=True)
         raise typer.Exit(code=1)
+    return download_url
 
-    target = output_path or Path(os.path.basename(key) or "download.bin")
-    if target.is_dir():
-        target = target / (os.path.basename(key) or "download.bin")
 
-    progress = Progress(
-        TextColumn("[bold]Downloading[/bold] {task.description}"),
-        BarColumn(),
-        DownloadColumn(),
-        TransferSpeedColumn(),
-        TimeElapsedColumn(),
-        console=console,
+def _cached_presigner(client, cache: UrlCache, bucket: str, key: str, duration: int | None) -> Callable[[], str]:
+    """A presign callable whose first call may reuse a cached URL.
+
+    Transfers call it again only after the URL was rejected or the connection dropped,
+    so every later call asks the API for a fresh URL (and caches that one).
+    """
+    calls = 0
+
+    def presign() -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1 and (hit := cache.get(bucket, key, duration)):
+            return hit[0]
+        url = _presign_download(client, bucket, key, duration)
+        cache.put(bucket, key, duration, url)
+        return url
+
+    return presign
+
+
+@files_app.command("url")
+def presign_urls(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        keys: list[str] | None = typer.Argument(None, help="Remote keys (or use --prefix)."),
+        prefix: str | None = typer.Option(None, "--prefix", help="Issue URLs for every file under this prefix."),
+        duration: int | None = typer.Option(None, "--duration", help="Pre-signed URL lifetime in seconds."),
+        workers: int = typer.Option(8, "--workers", min=1, help="Concurrent presign requests."),
+        no_cache: bool = typer.Option(False, "--no-cache", help="Always request new URLs."),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Print pre-signed download URLs as NDJSON ({"key", "url", "expires_at"} per line).
+
+    URLs are cached locally and reused until shortly before they expire, so repeated
+    calls (and `files download`) skip the presign request.
+    """
+    if not keys and prefix is None:
+        typer.echo("Error: pass one or more keys or --prefix.", err=True)
+        raise typer.Exit(code=1)
+
+    client = get_client(project)
+    cache = UrlCache.for_project(project)
+
+    def issue(key: str) -> dict[str, Any]:
+        hit = None if no_cache else cache.get(bucket, key, duration)
+        if hit is not None:
+            url, expires_at = hit
+        else:
+            url = _presign_download(client, bucket, key, duration)
+            expires_at = cache.put(bucket, key, duration, url) if not no_cache else url_expiry(url)
+        expires = datetime.fromtimestamp(expires_at, timezone.utc).isoformat() if expires_at else None
+        return {"key": key, "url": url, "expires_at": expires}
+
+    source: Iterable[str] = keys or []
+    if prefix is not None:
+        source = itertools.chain(source, (item["key"] for item in _walk_remote(client, bucket, prefix)))
+
+    failed = 0
+
+    def rows() -> Iterator[dict[str, Any]]:
+        nonlocal failed
+        for key, row, error in run_bounded(issue, source, workers):
+            if error is not None:
+                failed += 1
+                if not isinstance(error, typer.Exit):
+                    typer.echo(f"Error: {key}: {error}", err=True)
+                continue
+            yield row
+
+    try:
+        stream_output(rows(), [], "ndjson")
+    finally:
+        cache.close()
+    if failed:
+        typer.echo(f"{failed} key(s) failed.", err=True)
+        raise typer.Exit(code=1)
+
+
+def _cache_download(
+        cache: ObjectCache | None, bucket: str, key: str, etag: str | None, target: Path, decoded: bool
+) -> None:
+    """Add a finished download to the local object cache; a failure there doesn't fail the download."""
+    if cache is None or not etag:
+        return
+    try:
+        cache.store(bucket, key, decoded=decoded, etag=etag, source=target)
+    except OSError as e:
+        typer.echo(f"Warning: could not add {key} to the local cache: {e}", err=True)
+
+
+@files_app.command("download")
+def download_file(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        key: str = typer.Argument(help="Remote key to download (a prefix with -r)."),
+        output_path: Path | None = typer.Option(
+            None, "--output", "-o", help="Output path (defaults to the key's basename in cwd); '-' writes to stdout."
+        ),
+        duration: int | None = typer.Option(
+            None, "--duration", help="Pre-signed URL lifetime in seconds."
+        ),
+        no_cache: bool = typer.Option(False, "--no-cache", help="Don't reuse a cached pre-signed URL."),
+        parallel: int = typer.Option(
+            1, "--parallel", min=1, help="Fetch the object as N byte ranges concurrently (not resumable)."
+        ),
+        recursive: bool = typer.Option(
+            False, "--recursive", "-r", help="Treat KEY as a prefix and download everything under it into -o DIR."
+        ),
+        workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Concurrent downloads with -r."),
+        verify: bool = typer.Option(
+            False, "--verify", help="Hash the data while downloading and compare it with the object's checksum."
+        ),
+        decompress: bool = typer.Option(
+            True, "--decompress/--raw", help="Undo a gzip/zstd Content-Encoding, or keep the stored bytes."
+        ),
+        limit_rate: str | None = typer.Option(
+            None, "--limit-rate", help="Cap total bandwidth in bytes/s across all transfers, e.g. 500K or 10M."
+        ),
+        local_cache: bool = typer.Option(
+            False, "--local-cache", help="Reuse a locally cached copy while the object's ETag is unchanged."
+        ),
+        local_cache_size: str = typer.Option(
+            "10G", "--local-cache-size", help="Size cap of the local cache; least recently used objects are evicted."
+        ),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Download an object from a bucket using a pre-signed URL.
+
+    Data is written to `<output>.part` and renamed on completion; re-running the same
+    command after an interruption resumes from where it stopped. With -r, files already
+    present with the same size and ETag are skipped.
+
+    Objects uploaded with --compress are decompressed unless --raw is given. With -r the
+    stored bytes are kept, so the size/ETag comparison still works on the next run.
+
+    With --local-cache, downloaded files are kept in ~/.novps/cache/objects/ and a later
+    download of an unchanged object costs a conditional request (none with -r, whose
+    listing carries the ETags) plus a reflink or copy of the cached file.
+    """
+    client = get_client(project)
+    object_cache = ObjectCache.for_project(project, _parse_size(local_cache_size)) if local_cache else None
+
+    if recursive:
+        prefix = key.strip("/") + "/" if key.strip("/") else ""
+        try:
+            _sync_down(client, bucket, prefix, output_path or Path("."), delete=False, checksum=True, dry_run=False,
+                       scheduler=_scheduler(workers, limit_rate), verify=verify, cache=object_cache)
+        finally:
+            if object_cache is not None:
+                object_cache.close()
+        return
+
+    scheduler = _scheduler(parallel, limit_rate)
+
+    verified, on_verified = _verification(verify)
+    url_cache = None if no_cache else UrlCache.for_project(project)
+    presign: Callable[[], str] = (
+        (lambda: _presign_download(client, bucket, key, duration)) if url_cache is None
+        else _cached_presigner(client, url_cache, bucket, key, duration)
     )
+
     try:
-        with httpx.Client(timeout=None) as http:
-            with http.stream("GET", download_url) as stream:
-                if stream.status_code >= 400:
-                    body_text = stream.read().decode(errors="replace")
-                    typer.echo(
-                        f"Error: download failed with status {stream.status_code}: {body_text[:200]}",
-                        err=True,
+        if output_path is not None and str(output_path) == "-":
+            try:
+                with scheduler.client() as http:
+                    download_to_stream(
+                        http, presign, sys.stdout.buffer,
+                        on_verified=on_verified,
+                        decompress=decompress,
                     )
-                    raise typer.Exit(code=1)
-                total = int(stream.headers.get("Content-Length") or 0) or None
-                with progress:
-                    task_id = progress.add_task(key, total=total)
-                    with target.open("wb") as f:
-                        for chunk in stream.iter_bytes(chunk_size=1024 * 1024):
-                            f.write(chunk)
-                            progress.update(task_id, advance=len(chunk))
-    except httpx.HTTPError as e:
-        typer.echo(f"Error: download failed: {e}", err=True)
-        raise typer.Exit(code=1) from e
+            except TransferError as e:
+                typer.echo(f"Error: download failed: {e}", err=True)
+                raise typer.Exit(code=1) from e
+            if verified and verified[0] is None:
+                typer.echo("Warning: the server returned no usable checksum; download not verified.", err=True)
+            return
+
+        target = output_path or Path(os.path.basename(key) or "download.bin")
+        if target.is_dir():
+            target = target / (os.path.basename(key) or "download.bin")
+
+        if object_cache is not None and (hit := object_cache.lookup(bucket, key, decoded=decompress)):
+            etag, blob = hit
+            with scheduler.client() as http:
+                fresh = etag_matches(http, presign(), etag)
+            if fresh:
+                method = object_cache.checkout(blob, target)
+                typer.echo(f"Downloaded {bucket}/{key} -> {target} (local cache, {method})")
+                return
+
+        progress = _transfer_progress("Downloading")
+        with progress:
+            task_id = progress.add_task(key, total=None)
+            try:
+                with scheduler.client() as http:
+                    callbacks = {
+                        "on_start": lambda total, offset: progress.update(task_id, total=total, completed=offset),
+                        "on_progress": lambda n: progress.update(task_id, advance=n),
+                        "on_verified": on_verified,
+                        "decompress": decompress,
+                        "on_etag": lambda etag: _cache_download(object_cache, bucket, key, etag, target, decompress),
+                    }
+                    if parallel <= 1 or not download_segmented(http, presign, target, segments=parallel, **callbacks):
+                        download_resumable(http, presign, target, **callbacks)
+            except TransferError as e:
+                typer.echo(f"Error: download failed: {e}", err=True)
+                raise typer.Exit(code=1) from e
+    finally:
+        if url_cache is not None:
+            url_cache.close()
+        if object_cache is not None:
+            object_cache.close()
 
     typer.echo(f"Downloaded {bucket}/{key} -> {target}")
+    _report_verification(verified)
+
+
+def _to_stdout(
+        client,
+        bucket: str,
+        key: str,
+        project: str,
+        read: Callable[[httpx.Client, Callable[[], str]], Any],
+) -> None:
+    """Run `read(http, presign)` against stdout, exiting quietly if the reader closes the pipe."""
+    cache = UrlCache.for_project(project)
+    try:
+        with _scheduler(1, None).client() as http:
+            read(http, _cached_presigner(client, cache, bucket, key, None))
+    except BrokenPipeError:
+        # e.g. `| head`: stop like coreutils do, without a traceback on interpreter exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except TransferError as e:
+        typer.echo(f"Error: read failed: {e}", err=True)
+        raise typer.Exit(code=1) from e
+    finally:
+        cache.close()
+
+
+@files_app.command("cat")
+def cat_file(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        key: str = typer.Argument(help="Remote key."),
+        decompress: bool = typer.Option(
+            True, "--decompress/--raw", help="Undo a gzip/zstd Content-Encoding, or keep the stored bytes."
+        ),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Write an object to stdout."""
+    client = get_client(project)
+    _to_stdout(client, bucket, key, project,
+               lambda http, presign: download_to_stream(http, presign, sys.stdout.buffer, decompress=decompress))
+
+
+@files_app.command("head")
+def head_file(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        key: str = typer.Argument(help="Remote key."),
+        count: str = typer.Option("1K", "--bytes", "-c", help="Number of bytes to print, e.g. 512, 64K or 1M."),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Print the first bytes of an object, fetching only those with a Range request.
+
+    Bytes are printed as stored; objects uploaded with --compress are still compressed.
+    """
+    length = _parse_size(count)
+    client = get_client(project)
+    _to_stdout(client, bucket, key, project,
+               lambda http, presign: read_range(http, presign, sys.stdout.buffer, offset=0, length=length))
+
+
+@files_app.command("tail")
+def tail_file(
+        bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
+        key: str = typer.Argument(help="Remote key."),
+        count: str = typer.Option("1K", "--bytes", "-c", help="Number of bytes to print, e.g. 512, 64K or 1M."),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Print the last bytes of an object, fetching only those with a Range request.
+
+    Bytes are printed as stored; objects uploaded with --compress are still compressed.
+    """
+    length = _parse_size(count)
+    client = get_client(project)
+    _to_stdout(client, bucket, key, project,
+               lambda http, presign: read_range(http, presign, sys.stdout.buffer, offset=-length) if length else 0)
+
+
+def _parse_object_spec(spec: str) -> tuple[str, str]:
+    """Split `<bucket>:<key>`, the same syntax `sync` takes; the key may be empty or a prefix."""
+    remote = _split_remote(spec)
+    if remote is None:
+        typer.echo(f"Error: expected <bucket>:<key>, got '{spec}'.", err=True)
+        raise typer.Exit(code=1)
+    return remote
+
+
+def _copy_object(
+        client,
+        http: httpx.Client,
+        cache: UrlCache,
+        src_bucket: str,
+        src_key: str,
+        dst_bucket: str,
+        dst_key: str,
+        *,
+        server_side: list[bool],
+        size: int | None,
+        part_size: int,
+        workers: int,
+        on_progress: Callable[[int], None],
+) -> int:
+    """Copy one object, server-side while the API supports it (`server_side[0]`), else streamed."""
+    if server_side[0]:
+        resp = client.post_optional(
+            f"/storage/{dst_bucket}/files/copy",
+            data={"source_bucket": src_bucket, "source_key": src_key, "key": dst_key},
+        )
+        if resp is not None:
+            copied = size or int((resp.get("data") or {}).get("size") or 0)
+            on_progress(copied)
+            return copied
+        server_side[0] = False
+    return copy_object(
+        client, http, dst_bucket, dst_key,
+        _cached_presigner(client, cache, src_bucket, src_key, None),
+        lambda metadata: _presign_upload(client, dst_bucket, dst_key, metadata),
+        size=size,
+        part_size=part_size,
+        workers=workers,
+        on_progress=on_progress,
+    )
+
+
+@files_app.command("copy")
+def copy_files(
+        source: str = typer.Argument(help="Source as <bucket>:<key> (a prefix with -r)."),
+        destination: str = typer.Argument(
+            help="Destination as <bucket>:<key>; an empty key or a trailing '/' keeps the source file name."
+        ),
+        recursive: bool = typer.Option(False, "--recursive", "-r", help="Copy everything under the source prefix."),
+        stream: bool = typer.Option(
+            False, "--stream", help="Skip the server-side copy and pipe the data through this machine."
+        ),
+        part_size: int = typer.Option(
+            DEFAULT_PART_SIZE // MIB, "--part-size", min=5,
+            help="Multipart part size in MiB; larger objects are copied as parallel byte ranges.",
+        ),
+        workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Parallel object or part copies."),
+        limit_rate: str | None = typer.Option(
+            None, "--limit-rate", help="Cap total bandwidth in bytes/s across all transfers, e.g. 500K or 10M."
+        ),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Copy objects within or between buckets without downloading them to disk.
+
+    The API is asked to copy each object itself; if it has no copy endpoint, the
+    pre-signed GET is piped into a pre-signed PUT chunk by chunk, objects larger than
+    --part-size as a multipart upload of byte ranges.
+    """
+    src_bucket, src_key = _parse_object_spec(source)
+    dst_bucket, dst_key = _parse_object_spec(destination)
+    client = get_client(project)
+    cache = UrlCache.for_project(project)
+    server_side = [not stream]
+    scheduler = _scheduler(workers, limit_rate)
+
+    if not recursive:
+        if not src_key or src_key.endswith("/"):
+            typer.echo("Error: the source must be a key; pass -r to copy a prefix.", err=True)
+            raise typer.Exit(code=1)
+        if not dst_key or dst_key.endswith("/"):
+            dst_key += os.path.basename(src_key)
+        if (src_bucket, src_key) == (dst_bucket, dst_key):
+            typer.echo("Error: source and destination are the same object.", err=True)
+            raise typer.Exit(code=1)
+        progress = _transfer_progress("Copying")
+        try:
+            # Piping holds a GET and a PUT connection open per transfer; only the PUT is metered.
+            with progress, scheduler.client(2 * workers, meter_responses=False) as http:
+                task_id = progress.add_task(src_key, total=None)
+                _copy_object(
+                    client, http, cache, src_bucket, src_key, dst_bucket, dst_key,
+                    server_side=server_side,
+                    size=None,
+                    part_size=part_size * MIB,
+                    workers=workers,
+                    on_progress=lambda n: progress.update(task_id, advance=n),
+                )
+        except TransferError as e:
+            typer.echo(f"Error: copy failed: {e}", err=True)
+            raise typer.Exit(code=1) from e
+        finally:
+            cache.close()
+        typer.echo(f"Copied {src_bucket}/{src_key} -> {dst_bucket}/{dst_key}")
+        return
+
+    src_prefix = src_key.strip("/") + "/" if src_key.strip("/") else ""
+    dst_prefix = dst_key.strip("/") + "/" if dst_key.strip("/") else ""
+    if src_bucket == dst_bucket and dst_prefix.startswith(src_prefix):
+        typer.echo("Error: the destination prefix is inside the source prefix.", err=True)
+        raise typer.Exit(code=1)
+
+    copied = failed = total_bytes = 0
+    started = time.monotonic()
+    progress = _transfer_progress("Copying")
+    try:
+        with progress, scheduler.client(2 * workers, meter_responses=False) as http:
+            task_id = progress.add_task(source, total=None)
+            scheduler.on_stats = _show_stats(progress, task_id, source)
+
+            def copy(item: dict[str, Any]) -> int:
+                key = item["key"]
+                # Objects are already copied in parallel, so a large one copies its parts serially.
+                return _copy_object(
+                    client, http, cache, src_bucket, key, dst_bucket, dst_prefix + key[len(src_prefix):],
+                    server_side=server_side,
+                    size=int(item.get("size") or 0),
+                    part_size=part_size * MIB,
+                    workers=1,
+                    on_progress=lambda n: progress.update(task_id, advance=n),
+                )
+
+            items = _walk_remote(client, src_bucket, src_prefix)
+            for item, size, error in scheduler.run(copy, items, size=lambda i: int(i.get("size") or 0)):
+                if error is not None:
+                    failed += 1
+                    if not isinstance(error, typer.Exit):
+                        progress.console.print(f"[red]failed[/red] {item['key']}: {error}")
+                    continue
+                copied += 1
+                total_bytes += size
+    finally:
+        cache.close()
+
+    _print_transfer_summary("Copied", copied, total_bytes, time.monotonic() - started, failed)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _post_with_retries(client, path: str, data: dict[str, Any]) -> Any:
+    """POST, retrying transport errors, 429 and 5xx with backoff.
+
+    Any other error response is reported once by the client and exits immediately;
+    a request still failing after the last retry is reported here.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return client.post_retryable(path, data)
+        except TransientError as e:
+            if attempt == MAX_RETRIES:
+                typer.echo(f"Error: {e}", err=True)
+                raise typer.Exit(code=1) from e
+            time.sleep(retry_delay(attempt))
+
+
+def _rename_key(client, bucket: str, key: str, new_key: str) -> None:
+    _post_with_retries(client, f"/storage/{bucket}/files/rename", {"key": key, "new_key": new_key})
+
+
+def _rename_journal(project: str, bucket: str, prefix: str, new_prefix: str) -> Path:
+    digest = hashlib.sha256(f"{bucket}\0{prefix}\0{new_prefix}".encode()).hexdigest()[:16]
+    return STATE_DIR / project / "renames" / f"{digest}.log"
+
+
+def _rename_prefix(client, bucket: str, prefix: str, new_prefix: str, *, workers: int, project: str) -> None:
+    """Move every object under `prefix` to `new_prefix`, `workers` renames at a time.
+
+    Each finished rename is appended to a journal in STATE_DIR, so an interrupted move
+    resumes by listing what is left and skipping keys the journal (or a stale listing)
+    says are already done. The journal is removed once everything has moved.
+    """
+    journal = _rename_journal(project, bucket, prefix, new_prefix)
+    journal.parent.mkdir(parents=True, exist_ok=True)
+    moved: set[str] = set()
+    if journal.exists():
+        with journal.open() as f:
+            moved = {line.split("\t", 1)[0] for line in f if line.strip()}
+        typer.echo(f"Resuming: {len(moved)} key(s) already moved.")
+
+    def pending() -> Iterator[str]:
+        for item in _walk_remote(client, bucket, prefix, workers=workers):
+            key = item.get("key", "")
+            if key in moved:
+                continue
+            yield key
+
+    renamed = failed = 0
+    started = time.monotonic()
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[bold]Renaming[/bold] {task.description}"),
+        TextColumn("{task.completed} renamed, {task.fields[rate]} keys/s"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    with progress, journal.open("a") as log:
+        task_id = progress.add_task(f"{bucket}/{prefix}", rate=0)
+        window_start, window_count = started, 0
+        renames = run_bounded(
+            lambda key: _rename_key(client, bucket, key, new_prefix + key[len(prefix):]), pending(), workers
+        )
+        for key, _, error in renames:
+            if error is not None:
+                failed += 1
+                continue
+            log.write(f"{key}\t{new_prefix + key[len(prefix):]}\n")
+            log.flush()
+            renamed += 1
+            window_count += 1
+            now = time.monotonic()
+            if now - window_start >= 1:
+                progress.update(task_id, rate=round(window_count / (now - window_start)))
+                window_start, window_count = now, 0
+            progress.update(task_id, advance=1)
+
+    elapsed = time.monotonic() - started
+    typer.echo(
+        f"Renamed {renamed} object(s) in {elapsed:.1f}s ({renamed / elapsed if elapsed > 0 else 0:.0f} keys/s)."
+    )
+    if failed:
+        typer.echo(f"{failed} object(s) could not be renamed; re-run the same command to resume.", err=True)
+        raise typer.Exit(code=1)
+    journal.unlink(missing_ok=True)
 
 
 @files_app.command("rename")
 def rename_file(
         bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
-        key: str = typer.Argument(help="Current key."),
-        new_key: str = typer.Argument(help="New key."),
+        key: str = typer.Argument(help="Current key (a prefix with --prefix)."),
+        new_key: str = typer.Argument(help="New key (the new prefix with --prefix)."),
+        prefix: bool = typer.Option(
+            False, "--prefix", help="Treat KEY and NEW_KEY as prefixes and move everything under KEY."
+        ),
+        workers: int = typer.Option(8, "--workers", min=1, help="Concurrent rename requests with --prefix."),
         project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
-    """Rename (move) a file within a bucket."""
+    """Rename (move) a file within a bucket, or every file under a prefix.
+
+    With --prefix the listing is streamed and renamed concurrently. Progress is
+    checkpointed, so re-running an interrupted move picks up where it stopped.
+    """
     client = get_client(project)
+    if prefix:
+        old = key.strip("/") + "/" if key.strip("/") else ""
+        new = new_key.strip("/") + "/" if new_key.strip("/") else ""
+        if old == new:
+            typer.echo("Error: the new prefix is the same as the old one.", err=True)
+            raise typer.Exit(code=1)
+        if new.startswith(old):
+            # Keys already under the new prefix would be moved again or overwritten mid-run.
+            typer.echo("Error: the new prefix is inside the old one.", err=True)
+            raise typer.Exit(code=1)
+        _rename_prefix(client, bucket, old, new, workers=workers, project=project)
+        return
     client.post(f"/storage/{bucket}/files/rename", data={"key": key, "new_key": new_key})
     typer.echo(f"Renamed {bucket}/{key} -> {bucket}/{new_key}")
 
 
+DELETE_BATCH_SIZE = 1000
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+def _delete_batch(client, bucket: str, batch: list[str]) -> int:
+    resp = _post_with_retries(client, f"/storage/{bucket}/files/delete", {"keys": batch})
+    return (resp.get("data") or {}).get("deleted", len(batch))
+
+
+def _delete_keys(
+        client,
+        bucket: str,
+        keys: Iterable[str],
+        *,
+        batch_size: int = DELETE_BATCH_SIZE,
+        workers: int = 1,
+        on_deleted: Callable[[int], None] = lambda n: None,
+) -> tuple[int, int]:
+    """Delete keys in batches of `batch_size`, up to `workers` batches at a time.
+
+    `keys` is consumed lazily. Returns (deleted, failed) object counts.
+    """
+    deleted = failed = 0
+    batches = _chunked(keys, batch_size)
+    for batch, count, error in run_bounded(lambda b: _delete_batch(client, bucket, b), batches, workers):
+        if error is not None:
+            failed += len(batch)
+            continue
+        deleted += count
+        on_deleted(count)
+    return deleted, failed
+
+
 @files_app.command("delete")
 def delete_files(
         bucket: str = typer.Argument(help="Bucket identifier (internal_domain)."),
-        keys: list[str] = typer.Argument(help="Keys to delete (one or more)."),
+        keys: list[str] | None = typer.Argument(None, help="Keys to delete (one or more)."),
+        prefix: str | None = typer.Option(None, "--prefix", help="Delete every object under this prefix."),
+        glob: str | None = typer.Option(
+            None, "--glob", help="Only delete keys (relative to --prefix) matching this glob, e.g. '*.tmp'."
+        ),
+        batch_size: int = typer.Option(
+            DELETE_BATCH_SIZE, "--batch-size", min=1, max=1000, help="Keys per delete request."
+        ),
+        workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Concurrent delete requests."),
         force: bool = typer.Option(False, "--force", help="Skip confirmation."),
         project: str = typer.Option("default", "--project", "-p", help="Project alias."),
 ) -> None:
-    """Delete one or more files from a bucket."""
+    """Delete one or more files from a bucket, or everything matching --prefix/--glob."""
+    if prefix is not None or glob is not None:
+        if keys:
+            typer.echo("Error: pass either keys or --prefix/--glob, not both.", err=True)
+            raise typer.Exit(code=1)
+        _delete_matching(bucket, prefix or "", glob, batch_size=batch_size, workers=workers, force=force,
+                         project=project)
+        return
+
     if not keys:
         typer.echo("Error: at least one key is required.", err=True)
         raise typer.Exit(code=1)
@@ -402,6 +1513,295 @@ def delete_files(
     typer.echo(f"Deleted {deleted} object(s) from '{bucket}'.")
 
 
+def _delete_matching(
+        bucket: str,
+        prefix: str,
+        glob: str | None,
+        *,
+        batch_size: int,
+        workers: int,
+        force: bool,
+        project: str,
+) -> None:
+    what = f"every object under '{prefix or '/'}'" + (f" matching '{glob}'" if glob else "")
+    if not force and not typer.confirm(f"Delete {what} in bucket '{bucket}'?", default=False):
+        typer.echo("Aborted.", err=True)
+        raise typer.Exit(code=1)
+
+    client = get_client(project)
+
+    def matching() -> Iterator[str]:
+        for item in _walk_remote(client, bucket, prefix, workers=workers):
+            key = item.get("key", "")
+            if glob is None or fnmatch.fnmatchcase(key[len(prefix):], glob):
+                yield key
+
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[bold]Deleting[/bold] {task.description}"),
+        TextColumn("{task.completed} deleted"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    with progress:
+        task_id = progress.add_task(f"{bucket}/{prefix}")
+        deleted, failed = _delete_keys(
+            client, bucket, matching(),
+            batch_size=batch_size,
+            workers=workers,
+            on_deleted=lambda n: progress.update(task_id, advance=n),
+        )
+
+    typer.echo(f"Deleted {deleted} object(s) from '{bucket}'.")
+    if failed:
+        typer.echo(f"{failed} object(s) could not be deleted.", err=True)
+        raise typer.Exit(code=1)
+
+
+# ── sync ──────────────────────────────────────────────────────────────────
+
+
+def _split_remote(spec: str) -> tuple[str, str] | None:
+    """Split `bucket:key` into (bucket, key); None if `spec` is a local path."""
+    bucket, sep, key = spec.partition(":")
+    # A single letter before ':' is a Windows drive, not a bucket.
+    if not sep or len(bucket) <= 1 or "/" in bucket or os.sep in bucket:
+        return None
+    return bucket, key.lstrip("/")
+
+
+def _parse_remote(spec: str) -> tuple[str, str] | None:
+    """Split `bucket:prefix` into (bucket, prefix); None if `spec` is a local path."""
+    remote = _split_remote(spec)
+    if remote is None:
+        return None
+    bucket, prefix = remote
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    return bucket, prefix
+
+
+def _local_target(root: Path, rel: str) -> Path | None:
+    """Where the remote key suffix `rel` lands under `root`, or None if it would escape it.
+
+    Keys are untrusted: `..` segments, a leading `/` (e.g. from `prefix//etc/...`) or a
+    symlink inside `root` must not place a file anywhere else.
+    """
+    parts = rel.replace("\\", "/").split("/")
+    if rel.startswith("/") or ".." in parts or (parts and os.path.splitdrive(parts[0])[0]):
+        return None
+    target = root / rel
+    try:
+        target.resolve().relative_to(root.resolve())
+    except ValueError:
+        return None
+    return target
+
+
+def _remote_mtime(item: dict[str, Any]) -> float | None:
+    value = item.get("last_modified")
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def _needs_transfer(local: Path, item: dict[str, Any], *, upload: bool, checksum: bool) -> bool:
+    """Compare a local file with a remote listing item by size, then ETag (with --checksum) or mtime."""
+    try:
+        st = local.stat()
+    except FileNotFoundError:
+        return True
+    if item.get("size") is not None and int(item["size"]) != st.st_size:
+        return True
+    etag = str(item.get("etag") or "").strip('"')
+    if checksum and etag and "-" not in etag:
+        # Single-part ETags are the object's MD5; multipart ETags ("...-N") are not comparable.
+        return etag != file_digest(local)
+    remote_mtime = _remote_mtime(item)
+    if remote_mtime is None:
+        return False
+    return st.st_mtime > remote_mtime + 1 if upload else remote_mtime > st.st_mtime + 1
+
+
+def _sync_up(client, root: Path, bucket: str, prefix: str, *, delete: bool, checksum: bool, dry_run: bool,
+             scheduler: TransferScheduler) -> None:
+    workers = scheduler.max_transfers
+    remote = {item["key"][len(prefix):]: item for item in _walk_remote(client, bucket, prefix, workers=workers)}
+    seen: set[str] = set()
+
+    def plan() -> Iterator[tuple[Path, str]]:
+        for path, rel in _walk_files(root, [], []):
+            seen.add(rel)
+            item = remote.get(rel)
+            if item is None or _needs_transfer(path, item, upload=True, checksum=checksum):
+                if dry_run:
+                    typer.echo(f"upload: {path} -> {bucket}/{prefix}{rel}")
+                    continue
+                yield path, rel
+
+    transferred = failed = total_bytes = 0
+    started = time.monotonic()
+    progress = _transfer_progress("Syncing")
+    with progress, scheduler.client() as http:
+        task_id = progress.add_task(str(root), total=None)
+        scheduler.on_stats = _show_stats(progress, task_id, str(root))
+
+        def upload(entry: tuple[Path, str]) -> int:
+            path, rel = entry
+            key = prefix + rel
+            return put_file(
+                http, lambda: _presign_upload(client, bucket, key, {}), path,
+                on_progress=lambda n: progress.update(task_id, advance=n),
+            )
+
+        for (path, _), size, error in scheduler.run(upload, plan(), size=lambda e: e[0].stat().st_size):
+            if error is not None:
+                failed += 1
+                if not isinstance(error, typer.Exit):
+                    progress.console.print(f"[red]failed[/red] {path}: {error}")
+                continue
+            transferred += 1
+            total_bytes += size
+
+    stale = sorted(prefix + rel for rel in remote if rel not in seen)
+    if delete and stale:
+        if dry_run:
+            for key in stale:
+                typer.echo(f"delete: {bucket}/{key}")
+        else:
+            deleted, _ = _delete_keys(client, bucket, stale, workers=workers)
+            typer.echo(f"Deleted {deleted} remote object(s).")
+
+    if not dry_run:
+        _print_transfer_summary("Uploaded", transferred, total_bytes, time.monotonic() - started, failed)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _sync_down(client, bucket: str, prefix: str, root: Path, *, delete: bool, checksum: bool, dry_run: bool,
+               scheduler: TransferScheduler, verify: bool = False, cache: ObjectCache | None = None) -> None:
+    workers = scheduler.max_transfers
+    seen: set[str] = set()
+    verified, on_verified = _verification(verify)
+
+    unsafe: list[str] = []
+
+    def plan() -> Iterator[tuple[dict[str, Any], Path]]:
+        for item in _walk_remote(client, bucket, prefix, workers=workers):
+            rel = item["key"][len(prefix):]
+            if not rel:
+                continue
+            target = _local_target(root, rel)
+            if target is None:
+                typer.echo(f"Warning: skipping {bucket}/{item['key']}: it would be written outside {root}.", err=True)
+                unsafe.append(item["key"])
+                continue
+            seen.add(rel)
+            if _needs_transfer(target, item, upload=False, checksum=checksum):
+                if dry_run:
+                    typer.echo(f"download: {bucket}/{item['key']} -> {target}")
+                    continue
+                yield item, target
+
+    transferred = failed = total_bytes = 0
+    from_cache: list[str] = []
+    started = time.monotonic()
+    progress = _transfer_progress("Syncing")
+    with progress, scheduler.client() as http:
+        task_id = progress.add_task(f"{bucket}/{prefix}", total=None)
+        scheduler.on_stats = _show_stats(progress, task_id, f"{bucket}/{prefix}")
+
+        def download(entry: tuple[dict[str, Any], Path]) -> int:
+            item, target = entry
+            key = item["key"]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # The listing carries the current ETag, so a cache hit needs no request at all.
+            hit = cache.lookup(bucket, key, decoded=False) if cache is not None and item.get("etag") else None
+            if hit is not None and hit[0].strip('"') == str(item["etag"]).strip('"'):
+                cache.checkout(hit[1], target)
+                progress.update(task_id, advance=target.stat().st_size)
+                from_cache.append(key)
+            else:
+                download_resumable(
+                    http, lambda: _presign_download(client, bucket, key), target,
+                    on_progress=lambda n: progress.update(task_id, advance=n),
+                    on_verified=on_verified,
+                    on_etag=lambda etag: _cache_download(cache, bucket, key, etag, target, False),
+                )
+            # Keep the remote timestamp so the next sync sees the file as unchanged.
+            remote_mtime = _remote_mtime(item)
+            if remote_mtime is not None:
+                os.utime(target, (remote_mtime, remote_mtime))
+            return target.stat().st_size
+
+        for (item, _), size, error in scheduler.run(download, plan(), size=lambda e: int(e[0].get("size") or 0)):
+            if error is not None:
+                failed += 1
+                if not isinstance(error, typer.Exit):
+                    progress.console.print(f"[red]failed[/red] {item.get('key')}: {error}")
+                continue
+            transferred += 1
+            total_bytes += size
+
+    if delete and not failed and root.is_dir():
+        for path, rel in _walk_files(root, [], []):
+            if rel not in seen:
+                if dry_run:
+                    typer.echo(f"delete: {path}")
+                else:
+                    path.unlink()
+
+    if not dry_run:
+        _print_transfer_summary("Downloaded", transferred, total_bytes, time.monotonic() - started, failed)
+        if from_cache:
+            typer.echo(f"{len(from_cache)} file(s) taken from the local cache.")
+        _report_verification(verified)
+    if unsafe:
+        typer.echo(f"{len(unsafe)} key(s) skipped because they would escape {root}.", err=True)
+    if failed or unsafe:
+        raise typer.Exit(code=1)
+
+
+@app.command("sync")
+def sync(
+        src: str = typer.Argument(help="Source: a local directory or <bucket>:<prefix>."),
+        dst: str = typer.Argument(help="Destination: a local directory or <bucket>:<prefix>."),
+        delete: bool = typer.Option(False, "--delete", help="Delete destination files missing from the source."),
+        checksum: bool = typer.Option(
+            False, "--checksum", help="Compare content by MD5/ETag instead of modification time."
+        ),
+        dry_run: bool = typer.Option(False, "--dry-run", help="Only print what would be transferred or deleted."),
+        workers: int = typer.Option(DEFAULT_WORKERS, "--workers", min=1, help="Concurrent transfers."),
+        limit_rate: str | None = typer.Option(
+            None, "--limit-rate", help="Cap total bandwidth in bytes/s across all transfers, e.g. 500K or 10M."
+        ),
+        project: str = typer.Option("default", "--project", "-p", help="Project alias."),
+) -> None:
+    """Sync a local directory with a bucket prefix, in either direction.
+
+    Only new or changed files are transferred (size, then mtime or --checksum).
+    """
+    src_remote, dst_remote = _parse_remote(src), _parse_remote(dst)
+    if (src_remote is None) == (dst_remote is None):
+        typer.echo("Error: exactly one of SRC and DST must be <bucket>:<prefix>.", err=True)
+        raise typer.Exit(code=1)
+
+    client = get_client(project)
+    if dst_remote is not None:
+        root = Path(src)
+        if not root.is_dir():
+            typer.echo(f"Error: {src} is not a directory.", err=True)
+            raise typer.Exit(code=1)
+        _sync_up(client, root, *dst_remote, delete=delete, checksum=checksum, dry_run=dry_run,
+                 scheduler=_scheduler(workers, limit_rate))
+    else:
+        _sync_down(client, *src_remote, Path(dst), delete=delete, checksum=checksum, dry_run=dry_run,
+                   scheduler=_scheduler(workers, limit_rate))
+
+
 # ── keys ──────────────────────────────────────────────────────────────────
 
 
@@ -7,6 +7,8 @@ from typing import Any
 
 CONFIG_DIR = Path.home() / ".novps"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+CACHE_DIR = CONFIG_DIR / "cache"
+STATE_DIR = CONFIG_DIR / "state"
 
 DEFAULT_API_URL = "https://api.novps.io"
 
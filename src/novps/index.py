@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import fnmatch
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from novps.config import CACHE_DIR
+
+# Local SQLite copy of a bucket listing, so ls/du/find do not page through the API.
+# One database per (project, bucket); refreshed by walking the remote listing again and
+# writing only rows that were added, changed or removed.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_modified TEXT,
+    mtime REAL,
+    etag TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_mtime ON objects (mtime);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO objects (key, size, last_modified, mtime, etag) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    size = excluded.size, last_modified = excluded.last_modified, mtime = excluded.mtime, etag = excluded.etag
+WHERE size IS NOT excluded.size OR last_modified IS NOT excluded.last_modified OR etag IS NOT excluded.etag
+"""
+
+_BATCH_SIZE = 1000
+
+
+class BucketIndexError(Exception):
+    pass
+
+
+def index_path(project: str, bucket: str) -> Path:
+    return CACHE_DIR / "index" / project / f"{bucket}.sqlite3"
+
+
+def _prefix_bounds(prefix: str) -> tuple[str, str | None]:
+    """[low, high) key range of everything starting with `prefix`, so lookups use the primary key."""
+    if not prefix:
+        return "", None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _mtime(value: Any) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def _group_key(rest: str, depth: int) -> str:
+    parts = rest.split("/", depth)
+    return "/".join(parts[:depth]) + "/" if len(parts) > depth else rest
+
+
+class BucketIndex:
+    """A bucket's file listing (key, size, last-modified, ETag) in a local SQLite database."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.create_function("group_key", 2, _group_key, deterministic=True)
+        self._db.create_function("glob_match", 2, fnmatch.fnmatchcase, deterministic=True)
+
+    @classmethod
+    def open(cls, project: str, bucket: str, *, create: bool = False) -> BucketIndex:
+        path = index_path(project, bucket)
+        if not path.exists():
+            if not create:
+                raise BucketIndexError(f"No local index for bucket {bucket}; run `novps storage index {bucket}` first.")
+            path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(path)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> BucketIndex:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _where_prefix(self, prefix: str) -> tuple[str, list[Any]]:
+        low, high = _prefix_bounds(prefix)
+        if high is None:
+            return "1", []
+        return "key >= ? AND key < ?", [low, high]
+
+    def _count(self, prefix: str) -> int:
+        where, params = self._where_prefix(prefix)
+        return self._db.execute(f"SELECT count(*) FROM objects WHERE {where}", params).fetchone()[0]
+
+    def refresh(self, items: Iterable[dict[str, Any]], prefix: str = "") -> dict[str, int]:
+        """Replace the indexed contents under `prefix` with `items` (file items of a full walk).
+
+        Unchanged rows are not rewritten. Returns counts of added, updated and removed keys,
+        plus the total under the prefix afterwards.
+        """
+        db = self._db
+        with db:
+            before = self._count(prefix)
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+            db.execute("DELETE FROM seen")
+            start = db.total_changes
+            batch: list[tuple[Any, ...]] = []
+
+            def flush() -> None:
+                db.executemany(_UPSERT, batch)
+                db.executemany("INSERT OR IGNORE INTO seen (key) VALUES (?)", [(row[0],) for row in batch])
+                batch.clear()
+
+            for item in items:
+                modified = item.get("last_modified")
+                batch.append((item["key"], int(item.get("size") or 0), modified, _mtime(modified), item.get("etag")))
+                if len(batch) >= _BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+            seen = db.execute("SELECT count(*) FROM seen").fetchone()[0]
+            changed = db.total_changes - start - seen
+
+            where, params = self._where_prefix(prefix)
+            removed = db.execute(
+                f"DELETE FROM objects WHERE {where} AND key NOT IN (SELECT key FROM seen)", params
+            ).rowcount
+            after = self._count(prefix)
+            db.execute("DELETE FROM seen")
+            db.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('refreshed_at', ?)", (str(time.time()),)
+            )
+        added = after - before + removed
+        return {"added": added, "updated": changed - added, "removed": removed, "total": after}
+
+    def refreshed_at(self) -> float | None:
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'refreshed_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def files(
+        self,
+        prefix: str = "",
+        *,
+        glob: str | None = None,
+        newer: float | None = None,
+        larger: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield file items under `prefix` in key order, optionally filtered.
+
+        `glob` is matched with `fnmatch` against the key relative to `prefix` (`*` also
+        matches `/`), as `files delete --glob` does; `newer` is a UNIX timestamp and
+        `larger` a size in bytes.
+        """
+        where, params = self._where_prefix(prefix)
+        clauses = [where]
+        if glob:
+            clauses.append("glob_match(substr(key, ?), ?)")
+            params += [len(prefix) + 1, glob]
+        if newer is not None:
+            clauses.append("mtime > ?")
+            params.append(newer)
+        if larger is not None:
+            clauses.append("size > ?")
+            params.append(larger)
+        query = f"SELECT key, size, last_modified, etag FROM objects WHERE {' AND '.join(clauses)} ORDER BY key"
+        for row in self._db.execute(query, params):
+            yield {"type": "file", **dict(row)}
+
+    def children(self, prefix: str = "") -> Iterator[dict[str, Any]]:
+        """Yield the direct contents of a folder like the API does: subfolders, then files."""
+        where, params = self._where_prefix(prefix)
+        start = len(prefix) + 1
+        folders = self._db.execute(
+            f"SELECT DISTINCT group_key(substr(key, ?), 1) AS name FROM objects WHERE {where} "
+            "AND instr(substr(key, ?), '/') > 0 ORDER BY name",
+            [start, *params, start],
+        )
+        for row in folders:
+            yield {"type": "folder", "key": prefix + row["name"], "size": None, "last_modified": None}
+        files = self._db.execute(
+            f"SELECT key, size, last_modified, etag FROM objects WHERE {where} "
+            "AND instr(substr(key, ?), '/') = 0 ORDER BY key",
+            [*params, start],
+        )
+        for row in files:
+            yield {"type": "file", **dict(row)}
+
+    def usage(self, prefix: str = "", depth: int = 1) -> list[dict[str, Any]]:
+        """Object count and total size under `prefix`, grouped by the next `depth` path segments."""
+        where, params = self._where_prefix(prefix)
+        rows = self._db.execute(
+            f"SELECT group_key(substr(key, ?), ?) AS name, count(*) AS objects, sum(size) AS size "
+            f"FROM objects WHERE {where} GROUP BY name ORDER BY size DESC, name",
+            [len(prefix) + 1, depth, *params],
+        )
+        return [{"prefix": prefix + row["name"], "objects": row["objects"], "size": row["size"]} for row in rows]
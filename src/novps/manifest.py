@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+import pickle
 import re
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
 import yaml
 
-_VAR_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+from novps.client import _format_validation_error
+from novps.config import CACHE_DIR, STATE_DIR
+from novps.schema import validate_manifest
+
+try:
+    from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
+
+_VAR_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
 _ENV_LINE_PATTERN = re.compile(r"^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)$")
 
 
@@ -15,28 +28,160 @@ class ManifestError(Exception):
     pass
 
 
-def _substitute(value: Any, env: dict[str, str]) -> Any:
+class _Var:
+    """A `${NAME}` or `${NAME:-default}` reference inside a compiled string."""
+
+    __slots__ = ("name", "default")
+
+    def __init__(self, name: str, default: str | None) -> None:
+        self.name = name
+        self.default = default
+
+
+class _Template:
+    """A string parsed once into literal and `_Var` segments."""
+
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: tuple[str | _Var, ...]) -> None:
+        self.segments = segments
+
+    def render(self, env: dict[str, str], missing: set[str]) -> str:
+        parts: list[str] = []
+        for seg in self.segments:
+            if isinstance(seg, str):
+                parts.append(seg)
+                continue
+            value = env.get(seg.name)
+            if value is None or (value == "" and seg.default is not None):
+                if seg.default is None:
+                    missing.add(seg.name)
+                    continue
+                value = seg.default
+            parts.append(value)
+        return "".join(parts)
+
+
+def _compile_string(value: str) -> str | _Template:
+    if "${" not in value:
+        return value
+    segments: list[str | _Var] = []
+    pos = 0
+    for match in _VAR_PATTERN.finditer(value):
+        if match.start() > pos:
+            segments.append(value[pos:match.start()])
+        segments.append(_Var(match.group(1), match.group(2)))
+        pos = match.end()
+    if not segments:
+        return value
+    if pos < len(value):
+        segments.append(value[pos:])
+    return _Template(tuple(segments))
+
+
+def _compile(value: Any) -> Any:
+    """Turn a parsed YAML tree into one where strings with `${VAR}` become `_Template`s."""
     if isinstance(value, str):
-        missing: list[str] = []
-
-        def replace(match: re.Match[str]) -> str:
-            var_name = match.group(1)
-            if var_name not in env:
-                missing.append(var_name)
-                return ""
-            return env[var_name]
-
-        result = _VAR_PATTERN.sub(replace, value)
-        if missing:
-            raise ManifestError(f"Undefined environment variable(s): {', '.join(sorted(set(missing)))}")
-        return result
+        return _compile_string(value)
+    if isinstance(value, list):
+        return [_compile(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _compile(v) for k, v in value.items()}
+    return value
+
+
+def _render(value: Any, env: dict[str, str], missing: set[str]) -> Any:
+    if isinstance(value, _Template):
+        return value.render(env, missing)
     if isinstance(value, list):
-        return [_substitute(item, env) for item in value]
+        return [_render(item, env, missing) for item in value]
     if isinstance(value, dict):
-        return {k: _substitute(v, env) for k, v in value.items()}
+        return {k: _render(v, env, missing) for k, v in value.items()}
     return value
 
 
+def _substitute(compiled: Any, env: dict[str, str]) -> Any:
+    """Render a compiled tree against `env`, reporting every missing variable at once."""
+    missing: set[str] = set()
+    result = _render(compiled, env, missing)
+    if missing:
+        raise ManifestError(f"Undefined environment variable(s): {', '.join(sorted(missing))}")
+    return result
+
+
+# Compiled documents (templates already split into segments) are cached on disk keyed by
+# the file's mtime and size, so every new CLI process applying an unchanged manifest skips
+# both YAML parsing and template compilation. Bump the version when the compiled form changes.
+_CACHE_VERSION = 2
+
+
+def _cache_file(p: Path) -> Path:
+    digest = hashlib.sha256(str(p.resolve()).encode()).hexdigest()
+    return CACHE_DIR / "manifests" / f"{digest}.pickle"
+
+
+def _read_cache(cache_file: Path, st: os.stat_result) -> list[Any] | None:
+    # Pickle keeps the safe-loaded types (int keys, dates, bytes) exactly as a fresh parse
+    # returns them. The file lives in the user's private cache directory, like the token.
+    try:
+        with cache_file.open("rb") as f:
+            cached = pickle.load(f)
+    except Exception:
+        return None
+    if (
+        not isinstance(cached, dict)
+        or cached.get("version") != _CACHE_VERSION
+        or cached.get("mtime_ns") != st.st_mtime_ns
+        or cached.get("size") != st.st_size
+    ):
+        return None
+    return cached.get("documents")
+
+
+def _write_cache(cache_file: Path, st: os.stat_result, documents: list[Any]) -> None:
+    data = pickle.dumps(
+        {"version": _CACHE_VERSION, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "documents": documents},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp.unlink(missing_ok=True)
+        # The cache copies the raw manifest, which may hold literal secrets.
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        tmp.replace(cache_file)
+        # Earlier versions cached documents as world-readable JSON.
+        cache_file.with_suffix(".json").unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _iter_compiled(p: Path) -> Iterator[Any]:
+    """Yield the compiled YAML documents of `p` one by one, from the on-disk cache when fresh."""
+    st = p.stat()
+    cache_file = _cache_file(p)
+    cached = _read_cache(cache_file, st)
+    if cached is not None:
+        yield from cached
+        return
+    compiled: list[Any] = []
+    try:
+        with p.open() as f:
+            for doc in yaml.load_all(f, Loader=_SafeLoader):
+                item = _compile(doc)
+                compiled.append(item)
+                yield item
+    except yaml.YAMLError as e:
+        raise ManifestError(f"Failed to parse YAML: {e}") from e
+    _write_cache(cache_file, st, compiled)
+
+
+def dump_manifest(manifest: dict) -> str:
+    return yaml.dump(manifest, Dumper=_SafeDumper, sort_keys=False, default_flow_style=False, allow_unicode=True)
+
+
 def _unquote(value: str) -> str:
     value = value.strip()
     if len(value) >= 2 and value[0] == value[-1] and value[0] in ("'", '"'):
@@ -75,49 +220,137 @@ def load_env_file(path: str | Path) -> dict[str, str]:
     return result
 
 
-def load_manifest(
+def _build_manifest(raw: Any, env: dict[str, str], validate: bool) -> tuple[str | None, dict]:
+    if not isinstance(raw, dict):
+        raise ManifestError("Manifest must be a mapping with 'resources' and 'envs' keys")
+
+    data = _substitute(raw, env)
+
+    app_name = data.get("app")
+    if app_name is not None and not isinstance(app_name, str):
+        raise ManifestError("'app' must be a string")
+
+    manifest = {"resources": data.get("resources"), "envs": data.get("envs") or []}
+    if validate:
+        errors = validate_manifest(manifest)
+        if errors:
+            lines = "\n".join(f"  - {_format_validation_error(err)}" for err in errors)
+            raise ManifestError(f"Manifest is invalid ({len(errors)} error(s)):\n{lines}")
+    else:
+        if not isinstance(manifest["resources"], list) or len(manifest["resources"]) == 0:
+            raise ManifestError("Manifest must contain at least one resource under 'resources'")
+        if not isinstance(manifest["envs"], list):
+            raise ManifestError("'envs' must be a list")
+
+    return app_name, manifest
+
+
+def load_manifests(
     path: str | Path,
     env: dict[str, str] | None = None,
     env_file: str | Path | None = None,
-) -> dict:
-    """Load YAML manifest from file, substitute ${VAR} references.
-
-    Substitution sources, in order of precedence (later wins):
-      1. `env_file` contents (if provided)
-      2. `env` param if provided, else `os.environ`
+    validate: bool = True,
+) -> Iterator[tuple[str | None, dict]]:
+    """Lazily load every document of a (multi-document) YAML manifest.
 
-    Returns a dict ready to send to PUT /public-api/apps/{app_name}/apply.
+    Yields `(app, manifest)` pairs, where `app` is the document's optional top-level
+    `app:` key and `manifest` is the same dict `load_manifest` returns. Documents are
+    parsed, substituted and (unless `validate` is False) checked against the local
+    apply schema one at a time; empty documents are skipped.
     """
     p = Path(path)
     if not p.exists():
         raise ManifestError(f"Manifest file not found: {path}")
-    try:
-        raw = yaml.safe_load(p.read_text())
-    except yaml.YAMLError as e:
-        raise ManifestError(f"Failed to parse YAML: {e}") from e
-
-    if raw is None:
-        raise ManifestError("Manifest is empty")
-    if not isinstance(raw, dict):
-        raise ManifestError("Manifest must be a mapping with 'resources' and 'envs' keys")
 
     base_env: dict[str, str] = {}
     if env_file is not None:
         base_env.update(load_env_file(env_file))
     base_env.update(env if env is not None else os.environ)
 
-    data = _substitute(raw, base_env)
+    found = False
+    for raw in _iter_compiled(p):
+        if raw is None:
+            continue
+        found = True
+        yield _build_manifest(raw, base_env, validate)
+    if not found:
+        raise ManifestError("Manifest is empty")
 
-    resources = data.get("resources")
-    if not isinstance(resources, list) or len(resources) == 0:
-        raise ManifestError("Manifest must contain at least one resource under 'resources'")
 
-    envs = data.get("envs") or []
-    if not isinstance(envs, list):
-        raise ManifestError("'envs' must be a list")
+def load_manifest(
+    path: str | Path,
+    env: dict[str, str] | None = None,
+    env_file: str | Path | None = None,
+    validate: bool = True,
+) -> dict:
+    """Load YAML manifest from file, substitute ${VAR} and ${VAR:-default} references.
 
-    return {"resources": resources, "envs": envs}
+    Substitution sources, in order of precedence (later wins):
+      1. `env_file` contents (if provided)
+      2. `env` param if provided, else `os.environ`
+
+    Returns a dict ready to send to PUT /public-api/apps/{app_name}/apply.
+    Use `load_manifests` for files with several `---` documents.
+    """
+    documents = load_manifests(path, env=env, env_file=env_file, validate=validate)
+    _, manifest = next(documents)
+    if next(documents, None) is not None:
+        raise ManifestError("Manifest contains multiple documents; expected exactly one")
+    return manifest
 
 
 def resource_names(manifest: dict) -> list[str]:
     return [r.get("name", "") for r in manifest.get("resources", [])]
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def manifest_digests(manifest: dict) -> dict[str, Any]:
+    """Content hashes of a manifest: one for `envs` and one per resource, keyed by name."""
+    return {
+        "envs": _digest(manifest.get("envs", [])),
+        "resources": {r.get("name", ""): _digest(r) for r in manifest.get("resources", [])},
+    }
+
+
+def _state_file(project: str, app_name: str) -> Path:
+    return STATE_DIR / project / f"{app_name}.json"
+
+
+def load_apply_state(project: str, app_name: str) -> dict[str, Any]:
+    """Digests recorded by the last successful apply of `app_name`, or {} if unknown."""
+    try:
+        return json.loads(_state_file(project, app_name).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_apply_state(project: str, app_name: str, manifest: dict) -> None:
+    state_file = _state_file(project, app_name)
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    state_file.write_text(json.dumps(manifest_digests(manifest), indent=2) + "\n")
+
+
+def clear_apply_state(project: str, app_name: str) -> None:
+    _state_file(project, app_name).unlink(missing_ok=True)
+
+
+def changed_subset(manifest: dict, state: dict[str, Any]) -> tuple[dict, list[str]]:
+    """Split a manifest against a recorded apply state.
+
+    Returns the manifest restricted to new or changed resources (envs are always kept)
+    and the names of the resources that were left out as unchanged.
+    """
+    digests = manifest_digests(manifest)
+    known = state.get("resources") or {}
+    changed: list[dict] = []
+    skipped: list[str] = []
+    for r in manifest.get("resources", []):
+        name = r.get("name", "")
+        if known.get(name) == digests["resources"][name]:
+            skipped.append(name)
+        else:
+            changed.append(r)
+    return {**manifest, "resources": changed}, skipped
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from novps.config import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Downloaded objects kept for reuse, addressed by ETag so the same content under several
+# keys (or buckets) is stored once. Blobs are private to the user (objects from private
+# buckets land here) and handed out as reflink copies where the filesystem supports them,
+# plain copies otherwise; the least recently used ones are evicted once the total exceeds
+# the size cap.
+
+DEFAULT_MAX_SIZE = 10 * 1024 ** 3
+_FICLONE = 0x40049409  # linux/fs.h: clone a whole file (btrfs, XFS, bcachefs, ...)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used);
+CREATE TABLE IF NOT EXISTS entries (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    decoded INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    blob TEXT NOT NULL,
+    PRIMARY KEY (bucket, key, decoded)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_blob ON entries (blob);
+"""
+
+
+def clone_file(src: Path, dst: Path) -> str:
+    """Create `dst` (which must not exist) with the contents of `src`, as cheaply as possible.
+
+    Tries a reflink (copy-on-write clone), then a plain copy. Either way `dst` is an
+    independent file with default permissions. Returns which one was used.
+    """
+    if fcntl is not None:
+        with src.open("rb") as s, dst.open("xb") as d:
+            try:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+                return "reflink"
+            except OSError:
+                pass
+        dst.unlink()
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+class ObjectCache:
+    """Per-project store of downloaded objects with an LRU size cap. Safe to share between threads.
+
+    Entries map (bucket, key, decoded) to the ETag the object had when it was stored;
+    `decoded` tells a decompressed download apart from the stored bytes.
+    """
+
+    def __init__(self, root: Path, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.root = root
+        self.max_size = max_size
+        (root / "blobs").mkdir(parents=True, exist_ok=True, mode=0o700)
+        # Earlier versions created these with the default umask.
+        os.chmod(root, 0o700)
+        os.chmod(root / "blobs", 0o700)
+        self._db = sqlite3.connect(root / "index.sqlite3", check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def for_project(cls, project: str, max_size: int = DEFAULT_MAX_SIZE) -> ObjectCache:
+        return cls(CACHE_DIR / "objects" / project, max_size)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _blob_path(self, blob: str) -> Path:
+        return self.root / "blobs" / blob[:2] / blob
+
+    def lookup(self, bucket: str, key: str, *, decoded: bool) -> tuple[str, Path] | None:
+        """The cached (etag, blob path) for `key`, if there is one and its blob is still present."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, blob FROM entries WHERE bucket = ? AND key = ? AND decoded = ?",
+                (bucket, key, int(decoded)),
+            ).fetchone()
+        if row is None:
+            return None
+        path = self._blob_path(row[1])
+        return (row[0], path) if path.exists() else None
+
+    def checkout(self, blob: Path, target: Path) -> str:
+        """Place a cached blob at `target` (replacing it) and mark it recently used.
+
+        Returns how it was materialised ("reflink" or "copy"). Never a hard link: the
+        target's mode and mtime must not be shared with the blob or other checkouts.
+        """
+        tmp = target.with_name(target.name + ".cached")
+        tmp.unlink(missing_ok=True)
+        method = clone_file(blob, tmp)
+        os.replace(tmp, target)
+        with self._lock:
+            self._db.execute("UPDATE blobs SET last_used = ? WHERE id = ?", (time.time(), blob.name))
+        return method
+
+    def store(self, bucket: str, key: str, *, decoded: bool, etag: str, source: Path) -> None:
+        """Add the finished download `source` of `key` at `etag`, then evict down to the size cap.
+
+        The blob is a reflink or a copy, never a link to `source`, so later edits to the
+        downloaded file cannot corrupt the cache.
+        """
+        size = source.stat().st_size
+        blob = hashlib.sha256(f"{etag}\0{size}\0{int(decoded)}".encode()).hexdigest()
+        path = self._blob_path(blob)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True, mode=0o700)
+            tmp = path.with_name(f"{blob}.{threading.get_ident()}.tmp")
+            try:
+                clone_file(source, tmp)
+                os.chmod(tmp, 0o400)
+                os.replace(tmp, path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO blobs (id, size, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET last_used = excluded.last_used",
+                (blob, size, time.time()),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (bucket, key, decoded, etag, blob) VALUES (?, ?, ?, ?, ?)",
+                (bucket, key, int(decoded), etag, blob),
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            total = self._db.execute("SELECT coalesce(sum(size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_size:
+                return
+            for blob, size in self._db.execute("SELECT id, size FROM blobs ORDER BY last_used").fetchall():
+                if total <= self.max_size:
+                    break
+                self._blob_path(blob).unlink(missing_ok=True)
+                self._db.execute("DELETE FROM entries WHERE blob = ?", (blob,))
+                self._db.execute("DELETE FROM blobs WHERE id = ?", (blob,))
+                total -= size
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import csv
 import json
+import sys
+from collections.abc import Iterable
 from typing import Any
 
 import typer
@@ -8,6 +11,8 @@ from rich.console import Console
 from rich.table import Table
 
 console = Console()
+# Progress and status lines that must not mix with machine-readable output on stdout.
+err_console = Console(stderr=True)
 
 
 def print_table(data: list[dict[str, Any]], columns: list[tuple[str, str]], title: str | None = None) -> None:
@@ -38,3 +43,51 @@ def output(
         print_json(data)
     else:
         print_table(data, columns, title)
+
+
+def stream_output(
+    rows: Iterable[dict[str, Any]],
+    columns: list[tuple[str, str]],
+    fmt: str,
+    title: str | None = None,
+    *,
+    batch_size: int = 500,
+) -> int:
+    """Print rows as they arrive instead of collecting them first. Returns the row count.
+
+    fmt: "ndjson" (one JSON object per line), "csv" (header from column keys) or "table"
+    (a Rich table per `batch_size` rows, header on the first one only).
+    """
+    count = 0
+    if fmt == "ndjson":
+        for row in rows:
+            sys.stdout.write(json.dumps(row) + "\n")
+            count += 1
+        return count
+    if fmt == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow([key for key, _ in columns])
+        for row in rows:
+            writer.writerow([row.get(key, "") for key, _ in columns])
+            count += 1
+        return count
+
+    batch: list[dict[str, Any]] = []
+
+    def flush(first: bool) -> None:
+        table = Table(title=title if first else None, show_header=first)
+        for _, header in columns:
+            table.add_column(header)
+        for row in batch:
+            table.add_row(*(str(row.get(key, "")) for key, _ in columns))
+        console.print(table)
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        count += 1
+        if len(batch) >= batch_size:
+            flush(count == len(batch))
+    if batch or count == 0:
+        flush(count == len(batch))
+    return count
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any
+
+# Local schema of the PUT /public-api/apps/{app_name}/apply payload, written in a small
+# JSON Schema subset (type, required, properties, items, minItems, enum, const, if/then).
+# It mirrors the server-side validation so malformed manifests fail before any API call.
+# Errors use the same `loc`/`msg`/`type` shape as the API's 422 responses.
+
+_ENV_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "required": ["key"],
+    "properties": {
+        "key": {"type": "string"},
+        "value": {"type": ["string", "integer", "number", "boolean", "null"]},
+    },
+}
+
+_RESOURCE_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "required": ["name", "type"],
+    "properties": {
+        "name": {"type": "string"},
+        "type": {"type": "string"},
+        "source_type": {"type": "string"},
+        "source": {"type": "object"},
+        "envs": {"type": "array", "items": _ENV_SCHEMA},
+    },
+    "if": {"properties": {"source_type": {"const": "github"}}, "required": ["source_type"]},
+    "then": {
+        "required": ["source"],
+        "properties": {"source": {"type": "object", "required": ["build_command"]}},
+    },
+}
+
+MANIFEST_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "required": ["resources"],
+    "properties": {
+        "resources": {"type": "array", "minItems": 1, "items": _RESOURCE_SCHEMA},
+        "envs": {"type": "array", "items": _ENV_SCHEMA},
+    },
+}
+
+_TYPE_CHECKS: dict[str, tuple[Any, str, str]] = {
+    "string": (str, "string_type", "Input should be a valid string"),
+    "integer": (int, "int_type", "Input should be a valid integer"),
+    "number": ((int, float), "float_type", "Input should be a valid number"),
+    "boolean": (bool, "bool_type", "Input should be a valid boolean"),
+    "object": (dict, "dict_type", "Input should be a valid dictionary"),
+    "array": (list, "list_type", "Input should be a valid list"),
+    "null": (type(None), "none_type", "Input should be None"),
+}
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if isinstance(value, bool) and name in ("integer", "number"):
+        return False
+    return isinstance(value, _TYPE_CHECKS[name][0])
+
+
+def _validate(value: Any, schema: dict[str, Any], loc: tuple, errors: list[dict]) -> None:
+    expected = schema.get("type")
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        if not any(_is_type(value, n) for n in names):
+            _, err_type, msg = _TYPE_CHECKS[names[0]]
+            errors.append({"loc": list(loc), "msg": msg, "type": err_type, "input": value})
+            return
+
+    if "const" in schema and value != schema["const"]:
+        errors.append({"loc": list(loc), "msg": f"Input should be {schema['const']!r}", "type": "literal_error",
+                       "input": value})
+    if "enum" in schema and value not in schema["enum"]:
+        choices = " or ".join(repr(c) for c in schema["enum"])
+        errors.append({"loc": list(loc), "msg": f"Input should be {choices}", "type": "enum", "input": value})
+
+    if isinstance(value, dict):
+        for field in schema.get("required", []):
+            if field not in value or value[field] is None:
+                errors.append({"loc": [*loc, field], "msg": "Field required", "type": "missing"})
+        for field, sub in schema.get("properties", {}).items():
+            if value.get(field) is not None:
+                _validate(value[field], sub, (*loc, field), errors)
+
+    if isinstance(value, list):
+        min_items = schema.get("minItems")
+        if min_items is not None and len(value) < min_items:
+            errors.append({"loc": list(loc), "msg": f"List should have at least {min_items} item(s)",
+                           "type": "too_short"})
+        if "items" in schema:
+            for i, item in enumerate(value):
+                _validate(item, schema["items"], (*loc, i), errors)
+
+    if "if" in schema:
+        probe: list[dict] = []
+        _validate(value, schema["if"], loc, probe)
+        if not probe and "then" in schema:
+            _validate(value, schema["then"], loc, errors)
+
+
+def validate_manifest(manifest: Any, schema: dict[str, Any] = MANIFEST_SCHEMA) -> list[dict]:
+    """Validate an apply payload against the local schema.
+
+    Returns every error found (empty list if valid), each a dict with `loc`, `msg` and `type`.
+    """
+    errors: list[dict] = []
+    _validate(manifest, schema, (), errors)
+    unique: dict[tuple, dict] = {}
+    for err in errors:
+        unique.setdefault((tuple(err["loc"]), err["type"]), err)
+    return list(unique.values())
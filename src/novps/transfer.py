@@ -0,0 +1,1453 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+import mmap
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import httpx
+
+MIB = 1024 * 1024
+DEFAULT_PART_SIZE = 64 * MIB
+MIN_PART_SIZE = 5 * MIB  # S3 rejects smaller non-final parts
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+
+ProgressCallback = Callable[[int], None]
+# Called once a transfer is checked, with the algorithm used, or None if the object
+# carries no checksum that can be compared. Passing one enables verification.
+VerifyCallback = Callable[[str | None], None]
+
+
+class TransferError(Exception):
+    pass
+
+
+def retry_delay(attempt: int) -> float:
+    return RETRY_BACKOFF * (2 ** attempt)
+
+
+def run_parallel(fn: Callable[[Any], Any], items: list[Any], workers: int) -> list[Any]:
+    """Map `fn` over `items` on a thread pool; on the first error, queued items are cancelled."""
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        return list(pool.map(fn, items))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_bounded(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int,
+) -> Iterator[tuple[Any, Any, BaseException | None]]:
+    """Run `fn` over a lazily consumed iterable with at most ~2×`workers` items in flight.
+
+    Yields `(item, result, error)` in completion order; an item's exception is returned
+    rather than raised so one failure does not stop the rest.
+    """
+    workers = max(1, workers)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending: dict[Future, Any] = {}
+
+    def drain(return_when: str) -> Iterator[tuple[Any, Any, BaseException | None]]:
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            item = pending.pop(future)
+            error = future.exception()
+            yield item, None if error else future.result(), error
+
+    try:
+        for item in items:
+            pending[pool.submit(fn, item)] = item
+            if len(pending) >= workers * 2:
+                yield from drain(FIRST_COMPLETED)
+        while pending:
+            yield from drain(FIRST_COMPLETED)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ── scheduling ────────────────────────────────────────────────────────
+
+
+THROTTLE_CHUNK = 128 * 1024  # bodies are metered in slices this small so concurrent transfers interleave
+LOOKAHEAD = 8  # items buffered per worker when picking the smallest pending transfer
+_END = object()
+
+StatsCallback = Callable[[dict[str, Any]], None]
+
+
+class RateLimiter:
+    """Token bucket shared by every transfer of a command.
+
+    Reservations are made under a lock in arrival order and slept off outside it, so
+    concurrent transfers asking for similar slices get an equal share of `rate`.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self._slack = (burst if burst is not None else max(rate / 4, THROTTLE_CHUNK)) / rate
+        self._lock = threading.Lock()
+        self._ready_at = time.monotonic()
+
+    def consume(self, n: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._ready_at = max(self._ready_at, now) + n / self.rate
+            delay = self._ready_at - now - self._slack
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    def __init__(self, stream: Any, scheduler: TransferScheduler) -> None:
+        self._stream = stream
+        self._scheduler = scheduler
+
+    def __iter__(self) -> Iterator[bytes]:
+        step = THROTTLE_CHUNK if self._scheduler.limiter is not None else 0
+        for chunk in self._stream:
+            if not step or len(chunk) <= step:
+                self._scheduler.account(len(chunk))
+                yield chunk
+                continue
+            # Release every view before moving on: chunks may be slices of an mmap (iter_file_body).
+            with memoryview(chunk) as view:
+                for start in range(0, len(view), step):
+                    with view[start:start + step] as piece:
+                        self._scheduler.account(len(piece))
+                        yield piece
+
+    def close(self) -> None:
+        if hasattr(self._stream, "close"):
+            self._stream.close()
+
+
+class _ScheduledTransport(httpx.BaseTransport):
+    """Meters request and (unless `meter_responses` is off) response bodies through the
+    scheduler's rate limit and stats."""
+
+    def __init__(
+        self, scheduler: TransferScheduler, transport: httpx.BaseTransport, meter_responses: bool = True
+    ) -> None:
+        self._scheduler = scheduler
+        self._transport = transport
+        self._meter_responses = meter_responses
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.stream = _MeteredStream(request.stream, self._scheduler)
+        response = self._transport.handle_request(request)
+        if self._meter_responses:
+            response.stream = _MeteredStream(response.stream, self._scheduler)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class TransferScheduler:
+    """One scheduler per command, shared by all of its transfers.
+
+    - `client()` returns an httpx client whose bodies count against a global
+      `limit_rate` (bytes/s) and feed the stats. Pass `meter_responses=False` when
+      every downloaded byte is uploaded again (a piped copy), so it is counted once.
+    - `run()` executes at most `max_transfers` transfers at once, smallest first.
+    - `on_stats` receives {"bytes", "rate", "active", "queued", "done", "failed"} at
+      most every PROGRESS_INTERVAL seconds, e.g. to update a Rich progress bar.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_transfers: int = DEFAULT_WORKERS,
+        limit_rate: float | None = None,
+        on_stats: StatsCallback | None = None,
+    ) -> None:
+        self.max_transfers = max(1, max_transfers)
+        self.limiter = RateLimiter(limit_rate) if limit_rate else None
+        self.on_stats = on_stats
+        self._lock = threading.Lock()
+        self.stats: dict[str, Any] = {"bytes": 0, "rate": 0.0, "active": 0, "queued": 0, "done": 0, "failed": 0}
+        self._last_emit = time.monotonic()
+        self._last_bytes = 0
+
+    def client(self, connections: int | None = None, *, meter_responses: bool = True) -> httpx.Client:
+        connections = connections or self.max_transfers
+        limits = httpx.Limits(max_connections=connections)
+        transport = _ScheduledTransport(self, httpx.HTTPTransport(limits=limits), meter_responses)
+        return httpx.Client(timeout=None, limits=limits, transport=transport)
+
+    def account(self, n: int) -> None:
+        if self.limiter is not None:
+            self.limiter.consume(n)
+        with self._lock:
+            self.stats["bytes"] += n
+        self._emit()
+
+    def _update(self, **delta: int) -> None:
+        with self._lock:
+            for name, value in delta.items():
+                self.stats[name] += value
+        self._emit(force=True)
+
+    def _emit(self, force: bool = False) -> None:
+        if self.on_stats is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_emit
+            if not force and elapsed < PROGRESS_INTERVAL:
+                return
+            if elapsed >= PROGRESS_INTERVAL:
+                instant = (self.stats["bytes"] - self._last_bytes) / elapsed
+                self.stats["rate"] = instant if not self.stats["rate"] else 0.7 * self.stats["rate"] + 0.3 * instant
+                self._last_emit, self._last_bytes = now, self.stats["bytes"]
+            snapshot = dict(self.stats)
+        self.on_stats(snapshot)
+
+    def run(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        size: Callable[[Any], int] = lambda item: 0,
+    ) -> Iterator[tuple[Any, Any, BaseException | None]]:
+        """Like `run_bounded`, but with up to LOOKAHEAD×`max_transfers` items buffered and the
+        smallest (by `size`) started first, so many small files are not stuck behind a few big ones.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_transfers)
+        pending: dict[Future, Any] = {}
+        waiting: list[tuple[int, int, Any]] = []
+        seq = itertools.count()
+        source = iter(items)
+        exhausted = False
+
+        def task(item: Any) -> Any:
+            self._update(active=1)
+            try:
+                return fn(item)
+            finally:
+                self._update(active=-1)
+
+        try:
+            while True:
+                while not exhausted and len(waiting) < self.max_transfers * LOOKAHEAD:
+                    item = next(source, _END)
+                    if item is _END:
+                        exhausted = True
+                        break
+                    heapq.heappush(waiting, (size(item), next(seq), item))
+                    self._update(queued=1)
+                while waiting and len(pending) < self.max_transfers:
+                    _, _, item = heapq.heappop(waiting)
+                    self._update(queued=-1)
+                    pending[pool.submit(task, item)] = item
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    error = future.exception()
+                    self._update(done=0 if error else 1, failed=1 if error else 0)
+                    yield item, None if error else future.result(), error
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+MIN_BODY_CHUNK = MIB
+MAX_BODY_CHUNK = 16 * MIB
+PROGRESS_INTERVAL = 0.1
+
+
+def body_chunk_size(size: int) -> int:
+    """Chunk size for streaming a file body: ~1/256 of the file, clamped to 1-16 MiB."""
+    return min(MAX_BODY_CHUNK, max(MIN_BODY_CHUNK, size // 256))
+
+
+class _ThrottledProgress:
+    """Batches progress callbacks so they fire at most every PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, on_progress: ProgressCallback) -> None:
+        self._on_progress = on_progress
+        self._pending = 0
+        self._last = time.monotonic()
+
+    def add(self, n: int) -> None:
+        self._pending += n
+        now = time.monotonic()
+        if now - self._last >= PROGRESS_INTERVAL:
+            self.flush()
+            self._last = now
+
+    def flush(self) -> None:
+        if self._pending:
+            self._on_progress(self._pending)
+            self._pending = 0
+
+
+def iter_file_body(
+    path: Path,
+    on_progress: ProgressCallback = lambda n: None,
+    hasher: StreamHasher | None = None,
+    *,
+    offset: int = 0,
+    length: int | None = None,
+) -> Iterator[bytes | memoryview]:
+    """Yield a file's contents as memoryview slices of an mmap, for use as an httpx request body.
+
+    Slicing the mapping avoids a read() copy into a fresh bytes object per chunk, chunks
+    grow with the body size, and progress is reported in throttled batches. A `hasher`
+    is fed the same slices as they are sent and is closed before the mapping is.
+    `offset` and `length` select a byte range, e.g. one multipart part.
+    """
+    end = path.stat().st_size if length is None else offset + length
+    if end <= offset:
+        if hasher is not None:
+            hasher.close()
+        return
+    chunk = body_chunk_size(end - offset)
+    progress = _ThrottledProgress(on_progress)
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            try:
+                for start in range(offset, end, chunk):
+                    stop = min(start + chunk, end)
+                    if hasher is not None:
+                        # A separate view: `piece` is released below while the hasher may still hold this one.
+                        hasher.update(view[start:stop])
+                    with view[start:stop] as piece:
+                        yield piece
+                        progress.add(len(piece))
+            finally:
+                progress.flush()
+                if hasher is not None:
+                    hasher.close()
+
+
+def put_file(
+    http: httpx.Client,
+    presign: Callable[[], str],
+    path: Path,
+    *,
+    content_type: str | None = None,
+    on_progress: ProgressCallback = lambda n: None,
+    on_verified: VerifyCallback | None = None,
+) -> int:
+    """PUT one file to a fresh pre-signed URL, retrying the whole file on failure. Returns its size.
+
+    With `on_verified`, the MD5 of the bytes being sent is computed from the same mmap
+    slices on a side thread and compared with the ETag the server returns.
+    """
+    size = path.stat().st_size
+    headers = {"Content-Length": str(size)}
+    if content_type:
+        headers["Content-Type"] = content_type
+    last_error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        sent = 0
+
+        def track(n: int) -> None:
+            nonlocal sent
+            sent += n
+            on_progress(n)
+
+        retryable = True
+        md5 = StreamHasher("md5") if on_verified is not None else None
+        try:
+            resp = http.put(presign(), content=iter_file_body(path, track, md5), headers=headers)
+        except httpx.TransportError as e:
+            last_error = str(e)
+        else:
+            if resp.status_code < 400:
+                if md5 is not None:
+                    _check_stored_md5(resp, md5.hexdigest(), str(path), on_verified)
+                return size
+            last_error = f"status {resp.status_code}: {resp.text[:200]}"
+            retryable = resp.status_code >= 500 or resp.status_code in (401, 403, 408, 429)
+        if md5 is not None:
+            md5.close()
+        on_progress(-sent)
+        if not retryable:
+            break
+        if attempt < MAX_RETRIES:
+            time.sleep(retry_delay(attempt))
+    raise TransferError(f"{path}: {last_error}")
+
+
+# ── checksums ─────────────────────────────────────────────────────────
+
+
+try:
+    import crc32c as _crc32c
+except ImportError:  # optional: only needed to verify objects that carry a CRC32C checksum
+    _crc32c = None
+
+_MD5_ETAG = re.compile(r"^[0-9a-f]{32}$")
+
+
+class _Crc32c:
+    """hashlib-style wrapper around the optional `crc32c` package."""
+
+    def __init__(self) -> None:
+        self._value = 0
+
+    def update(self, data: bytes) -> None:
+        self._value = _crc32c.crc32c(data, self._value)
+
+    def hexdigest(self) -> str:
+        return self._value.to_bytes(4, "big").hex()
+
+
+def _new_hash(algorithm: str) -> Any:
+    return _Crc32c() if algorithm == "crc32c" else hashlib.new(algorithm)
+
+
+def expected_checksum(headers: httpx.Headers) -> tuple[str, str] | None:
+    """The (algorithm, hex digest) an object's response headers let us verify against, if any.
+
+    Explicit `x-amz-checksum-*` headers win; otherwise a single-part ETag is the MD5.
+    Multipart ETags ("<md5>-<parts>") are not a digest of the content.
+    """
+    if value := headers.get("x-amz-checksum-sha256"):
+        return "sha256", base64.b64decode(value).hex()
+    if _crc32c is not None and (value := headers.get("x-amz-checksum-crc32c")):
+        return "crc32c", base64.b64decode(value).hex()
+    etag = headers.get("ETag", "").strip('"').lower()
+    if _MD5_ETAG.match(etag):
+        return "md5", etag
+    return None
+
+
+def file_digest(path: Path, algorithm: str = "md5", length: int | None = None) -> str:
+    """Hex digest of a file (or of its first `length` bytes)."""
+    h = _new_hash(algorithm)
+    remaining = path.stat().st_size if length is None else length
+    with path.open("rb") as f:
+        while remaining > 0 and (chunk := f.read(min(MIB, remaining))):
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+
+class StreamHasher:
+    """Hashes chunks on a background thread fed by a bounded queue.
+
+    hashlib releases the GIL on large buffers, so hashing overlaps with network I/O
+    instead of capping throughput at the hash speed.
+    """
+
+    def __init__(self, algorithm: str) -> None:
+        self.algorithm = algorithm
+        self.count = 0
+        self._hash = _new_hash(algorithm)
+        self._queue: queue.Queue[bytes | memoryview | None] = queue.Queue(maxsize=16)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while (chunk := self._queue.get()) is not None:
+            self._hash.update(chunk)
+
+    def update(self, chunk: bytes | memoryview) -> None:
+        self.count += len(chunk)
+        self._queue.put(chunk)
+
+    def update_file(self, path: Path, length: int) -> None:
+        """Feed the first `length` bytes of `path`, e.g. the part already downloaded before a resume."""
+        with path.open("rb") as f:
+            while self.count < length and (chunk := f.read(min(MIB, length - self.count))):
+                self.update(chunk)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def hexdigest(self) -> str:
+        self.close()
+        return self._hash.hexdigest()
+
+
+def _check_stored_md5(resp: httpx.Response, expected: str, what: str, on_verified: VerifyCallback) -> None:
+    stored = _stored_md5(resp)
+    if stored is not None and stored != expected:
+        raise TransferError(f"{what}: md5 mismatch (sent {expected}, server stored {stored})")
+    on_verified("md5" if stored is not None else None)
+
+
+def _md5_header(data: bytes | memoryview) -> tuple[str, str]:
+    """(hex digest, base64 Content-MD5 header value) of an in-memory body."""
+    digest = hashlib.md5(data).digest()
+    return digest.hex(), base64.b64encode(digest).decode()
+
+
+def _stored_md5(resp: httpx.Response) -> str | None:
+    etag = resp.headers.get("ETag", "").strip('"').lower()
+    return etag if _MD5_ETAG.match(etag) else None
+
+
+# ── compression ───────────────────────────────────────────────────────
+
+
+try:
+    import zstandard as _zstd
+except ImportError:  # optional: only needed for --compress zstd and zstd-encoded objects
+    _zstd = None
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def _require_zstd() -> Any:
+    if _zstd is None:
+        raise TransferError("zstd support requires the 'zstandard' package (pip install zstandard)")
+    return _zstd
+
+
+def compression_available(encoding: str) -> bool:
+    return encoding == "gzip" or (encoding == "zstd" and _zstd is not None)
+
+
+def _compressor(encoding: str) -> Any:
+    if encoding == "zstd":
+        return _require_zstd().ZstdCompressor(level=3).compressobj()
+    return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+class _Decompressor:
+    """gzip/zstd decompressor that reports corrupt input as a TransferError."""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = _require_zstd().ZstdDecompressor().decompressobj()
+        else:
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            return self._obj.decompress(data)
+        except Exception as e:  # zlib.error / zstandard.ZstdError
+            raise TransferError(f"cannot decompress {self.encoding} data: {e}") from e
+
+    def flush(self) -> bytes:
+        return self._obj.flush() if self.encoding == "gzip" else b""
+
+
+def content_encoding(headers: httpx.Headers) -> str | None:
+    """The stored object's compression, if it is one this module can decode."""
+    encoding = headers.get("Content-Encoding", "").strip().lower()
+    return encoding if encoding in COMPRESSIONS else None
+
+
+class CompressedReader:
+    """A read-only stream that compresses another stream as it is read.
+
+    Lets an upload of unknown compressed size go through `upload_stream` without
+    writing the compressed output anywhere first. `consumed` counts input bytes and
+    `produced` compressed bytes handed out.
+    """
+
+    def __init__(self, raw: BinaryIO, encoding: str) -> None:
+        self.encoding = encoding
+        self._raw = raw
+        self._compressor = _compressor(encoding)
+        self._buf = bytearray()
+        self._eof = False
+        self.consumed = 0
+        self.produced = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buf) < size):
+            chunk = self._raw.read(MIB)
+            if chunk:
+                self.consumed += len(chunk)
+                self._buf += self._compressor.compress(chunk)
+            else:
+                self._buf += self._compressor.flush()
+                self._eof = True
+        if size < 0:
+            size = len(self._buf)
+        out = bytes(self._buf[:size])
+        del self._buf[:size]
+        self.produced += len(out)
+        return out
+
+
+def decode_file(src: Path, dst: Path, encoding: str) -> None:
+    decompressor = _Decompressor(encoding)
+    with src.open("rb") as fin, dst.open("wb") as fout:
+        while chunk := fin.read(MIB):
+            fout.write(decompressor.decompress(chunk))
+        fout.write(decompressor.flush())
+
+
+def _finish_part(part: Path, target: Path, encoding: str | None) -> None:
+    """Move a completed `.part` into place, decompressing it on the way if `encoding` is set."""
+    if encoding is None:
+        os.replace(part, target)
+        return
+    tmp = target.with_name(target.name + ".decoding")
+    try:
+        decode_file(part, tmp, encoding)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, target)
+    part.unlink()
+
+
+# ── multipart upload ──────────────────────────────────────────────────
+
+
+def _put_part(
+    http: httpx.Client,
+    url: str,
+    data: bytes,
+    on_progress: ProgressCallback,
+    content_type: str | None = None,
+    verify: bool = False,
+    content_encoding: str | None = None,
+    refresh: Callable[[], str] | None = None,
+) -> str:
+    """PUT one in-memory part, retrying it on its own. Returns the part's ETag.
+
+    With `verify`, a Content-MD5 header lets the server reject a corrupted body and the
+    returned ETag is checked against the same digest; a mismatch is retried like any failure.
+    If `refresh` is given, a 401/403 (typically an expired URL) retries against `refresh()`.
+    """
+    headers = {"Content-Length": str(len(data))}
+    if content_type:
+        headers["Content-Type"] = content_type
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    md5 = None
+    if verify:
+        md5, headers["Content-MD5"] = _md5_header(data)
+    last_error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            resp = http.put(url, content=data, headers=headers)
+        except httpx.HTTPError as e:
+            last_error = str(e)
+        else:
+            stored = _stored_md5(resp)
+            if resp.status_code < 400 and md5 is not None and stored is not None and stored != md5:
+                last_error = f"md5 mismatch (sent {md5}, server stored {stored})"
+            elif resp.status_code < 400:
+                on_progress(len(data))
+                return resp.headers.get("ETag", "").strip('"')
+            else:
+                last_error = f"status {resp.status_code}: {resp.text[:200]}"
+                if refresh is not None and resp.status_code in (401, 403):
+                    url = refresh()
+        if attempt < MAX_RETRIES:
+            time.sleep(retry_delay(attempt))
+    raise TransferError(f"part upload failed after {MAX_RETRIES + 1} attempts: {last_error}")
+
+
+def _put_file_part(
+    http: httpx.Client,
+    url: str,
+    path: Path,
+    offset: int,
+    length: int,
+    on_progress: ProgressCallback,
+    verify: bool = False,
+    refresh: Callable[[], str] | None = None,
+) -> str:
+    """PUT `length` bytes of `path` from `offset` as one part, streamed from mmap slices.
+
+    Behaves like `_put_part`, except that every attempt sends a fresh body and takes back
+    the progress it reported if it fails. With `verify`, the Content-MD5 is computed from
+    the mapping up front, since the header has to precede the body.
+    """
+    headers = {"Content-Length": str(length)}
+    md5 = None
+    if verify:
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view, view[offset:offset + length] as part:
+                md5, headers["Content-MD5"] = _md5_header(part)
+    last_error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        sent = 0
+
+        def track(n: int) -> None:
+            nonlocal sent
+            sent += n
+            on_progress(n)
+
+        try:
+            resp = http.put(url, content=iter_file_body(path, track, offset=offset, length=length), headers=headers)
+        except httpx.HTTPError as e:
+            last_error = str(e)
+        else:
+            stored = _stored_md5(resp)
+            if resp.status_code < 400 and md5 is not None and stored is not None and stored != md5:
+                last_error = f"md5 mismatch (sent {md5}, server stored {stored})"
+            elif resp.status_code < 400:
+                return resp.headers.get("ETag", "").strip('"')
+            else:
+                last_error = f"status {resp.status_code}: {resp.text[:200]}"
+                if refresh is not None and resp.status_code in (401, 403):
+                    url = refresh()
+        on_progress(-sent)
+        if attempt < MAX_RETRIES:
+            time.sleep(retry_delay(attempt))
+    raise TransferError(f"part upload failed after {MAX_RETRIES + 1} attempts: {last_error}")
+
+
+def _start_multipart(client, bucket: str, key: str, metadata: dict[str, Any] | None) -> str | None:
+    """Open a multipart upload and return its id, or None if the API has no multipart endpoints."""
+    resp = client.post_optional(
+        f"/storage/{bucket}/files/multipart",
+        data={"key": key, "metadata": metadata or {}, "part_count": 0},
+    )
+    if resp is None:
+        return None
+    upload_id = (resp.get("data") or {}).get("upload_id")
+    if not upload_id:
+        raise TransferError("server did not return a multipart upload id")
+    return upload_id
+
+
+def _presign_part(client, bucket: str, key: str, upload_id: str, number: int) -> str:
+    resp = client.post(
+        f"/storage/{bucket}/files/multipart/parts",
+        data={"key": key, "upload_id": upload_id, "part_numbers": [number]},
+    )
+    urls = (resp.get("data") or {}).get("parts") or []
+    if not urls:
+        raise TransferError(f"server did not return an upload URL for part {number}")
+    return urls[0]["upload_url"]
+
+
+def _finish_multipart(
+    client,
+    bucket: str,
+    key: str,
+    upload_id: str,
+    collect: Callable[[], list[dict[str, Any]]],
+) -> None:
+    """Run `collect` to upload the parts, then complete the upload; abort it if any part fails."""
+    try:
+        completed = collect()
+    except BaseException:
+        client.post(f"/storage/{bucket}/files/multipart/abort", data={"key": key, "upload_id": upload_id})
+        raise
+    client.post(
+        f"/storage/{bucket}/files/multipart/complete",
+        data={"key": key, "upload_id": upload_id, "parts": sorted(completed, key=lambda p: p["part_number"])},
+    )
+
+
+def upload_multipart(
+    client,
+    http: httpx.Client,
+    bucket: str,
+    key: str,
+    path: Path,
+    presign: Callable[[], str],
+    *,
+    part_size: int = DEFAULT_PART_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    metadata: dict[str, Any] | None = None,
+    on_progress: ProgressCallback = lambda n: None,
+    on_verified: VerifyCallback | None = None,
+) -> None:
+    """Upload `path` as a multipart object: PUT parts concurrently, then complete.
+
+    Each part is presigned right before it is sent and again if its URL is rejected, so
+    slow uploads do not run past URL expiry. Each part is retried individually; if any
+    part still fails the upload is aborted server-side so no orphaned parts are left
+    behind. With `on_verified`, every part is sent with a Content-MD5 header and its ETag
+    checked. On an API without multipart endpoints the file is sent as a single PUT to
+    `presign()` instead.
+    """
+    verify = on_verified is not None
+    size = path.stat().st_size
+    part_size = max(part_size, MIN_PART_SIZE)
+    part_count = max(1, -(-size // part_size))
+    upload_id = _start_multipart(client, bucket, key, metadata)
+    if upload_id is None:
+        put_file(
+            http, presign, path,
+            content_type=(metadata or {}).get("ContentType"), on_progress=on_progress, on_verified=on_verified,
+        )
+        return
+
+    def upload(number: int) -> dict[str, Any]:
+        offset = (number - 1) * part_size
+        etag = _put_file_part(
+            http, _presign_part(client, bucket, key, upload_id, number),
+            path, offset, min(part_size, size - offset), on_progress, verify=verify,
+            refresh=lambda: _presign_part(client, bucket, key, upload_id, number),
+        )
+        return {"part_number": number, "etag": etag}
+
+    _finish_multipart(client, bucket, key, upload_id, lambda: run_parallel(upload, list(range(1, part_count + 1)), workers))
+    if on_verified is not None:
+        on_verified("md5")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Read `size` bytes unless the stream ends first (pipes may return short reads)."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = stream.read(size - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+
+def upload_stream(
+    client,
+    http: httpx.Client,
+    bucket: str,
+    key: str,
+    stream: BinaryIO,
+    presign: Callable[[], str],
+    *,
+    part_size: int = DEFAULT_PART_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    metadata: dict[str, Any] | None = None,
+    content_type: str | None = None,
+    content_encoding: str | None = None,
+    on_progress: ProgressCallback = lambda n: None,
+    on_verified: VerifyCallback | None = None,
+) -> int:
+    """Upload an unsized stream (e.g. stdin or a `CompressedReader`). Returns the number of bytes sent.
+
+    A stream shorter than one part is sent as a single PUT to `presign()`. Longer streams
+    become a multipart upload whose parts are presigned one by one as they are read; at
+    most about 2×`workers` parts are buffered in memory at a time.
+    """
+    verify = on_verified is not None
+    part_size = max(part_size, MIN_PART_SIZE)
+    first = _read_exact(stream, part_size)
+    if len(first) < part_size:
+        _put_part(http, presign(), first, on_progress, content_type, verify=verify, content_encoding=content_encoding)
+        if on_verified is not None:
+            on_verified("md5")
+        return len(first)
+
+    upload_id = _start_multipart(client, bucket, key, metadata)
+    if upload_id is None:
+        raise TransferError(
+            f"this API has no multipart uploads, so streams longer than {part_size // MIB} MiB cannot be sent"
+        )
+    total = 0
+
+    def chunks() -> Iterator[tuple[int, bytes]]:
+        nonlocal total
+        number, data = 1, first
+        while data:
+            total += len(data)
+            yield number, data
+            number, data = number + 1, _read_exact(stream, part_size)
+
+    def upload(part: tuple[int, bytes]) -> dict[str, Any]:
+        number, data = part
+        etag = _put_part(
+            http, _presign_part(client, bucket, key, upload_id, number), data, on_progress, verify=verify,
+            refresh=lambda: _presign_part(client, bucket, key, upload_id, number),
+        )
+        return {"part_number": number, "etag": etag}
+
+    def collect() -> list[dict[str, Any]]:
+        completed = []
+        for _, result, error in run_bounded(upload, chunks(), workers):
+            if error is not None:
+                raise error
+            completed.append(result)
+        return completed
+
+    _finish_multipart(client, bucket, key, upload_id, collect)
+    if on_verified is not None:
+        on_verified("md5")
+    return total
+
+
+# ── resumable download ────────────────────────────────────────────────
+
+
+def part_paths(target: Path) -> tuple[Path, Path]:
+    """The `.part` file a download is written to and its JSON sidecar."""
+    return target.with_name(target.name + ".part"), target.with_name(target.name + ".part.json")
+
+
+def _read_sidecar(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sidecar(
+    path: Path,
+    etag: str | None,
+    length: int | None,
+    offset: int,
+    checksum: tuple[str, str] | None = None,
+    encoding: str | None = None,
+) -> None:
+    state: dict[str, Any] = {"etag": etag, "length": length, "offset": offset}
+    if checksum is not None:
+        state["checksum"] = list(checksum)
+    if encoding is not None:
+        state["encoding"] = encoding
+    path.write_text(json.dumps(state))
+
+
+def _verify_digest(actual: str, expected: tuple[str, str], what: str) -> None:
+    if actual != expected[1]:
+        raise TransferError(f"{what}: {expected[0]} mismatch (expected {expected[1]}, got {actual})")
+
+
+def download_resumable(
+    http: httpx.Client,
+    presign: Callable[[], str],
+    target: Path,
+    *,
+    on_start: Callable[[int | None, int], None] = lambda total, offset: None,
+    on_progress: ProgressCallback = lambda n: None,
+    on_verified: VerifyCallback | None = None,
+    decompress: bool = False,
+    on_etag: Callable[[str | None], None] = lambda etag: None,
+) -> None:
+    """Download to `<target>.part` and atomically rename it to `target` when complete.
+
+    A sidecar records the object's ETag and length; a later call continues with
+    `Range: bytes=N-` if the ETag still matches, and starts over otherwise. `presign`
+    is called again whenever the URL is rejected (expired) or the connection drops.
+    `on_start(total, offset)` is called before each (re)started body.
+
+    With `on_verified`, the body is hashed as it arrives (a resumed download first
+    re-hashes the bytes already on disk) and checked against the object's checksum
+    before the rename; on mismatch the partial file is discarded.
+
+    The stored bytes are written as-is (Range offsets and checksums refer to them). With
+    `decompress`, a gzip or zstd Content-Encoding is undone while moving the finished
+    `.part` into place. `on_etag` receives the ETag of the object that ended up in `target`.
+    """
+    part, sidecar = part_paths(target)
+    state = _read_sidecar(sidecar) if part.exists() else None
+    offset = part.stat().st_size if state else 0
+    etag: str | None = state.get("etag") if state else None
+    length: int | None = state.get("length") if state else None
+    checksum: tuple[str, str] | None = tuple(state["checksum"]) if state and state.get("checksum") else None
+    encoding: str | None = state.get("encoding") if state else None
+    hasher: StreamHasher | None = None
+
+    url = presign()
+    attempt = 0
+    try:
+        while True:
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                with http.stream("GET", url, headers=headers) as resp:
+                    if resp.status_code in (401, 403) and attempt < MAX_RETRIES:
+                        # Pre-signed URL expired (or was revoked) — get a fresh one and resume.
+                        attempt += 1
+                        url = presign()
+                        continue
+                    if resp.status_code == 416 and offset and offset == length:
+                        break
+                    if resp.status_code >= 400:
+                        body = resp.read().decode(errors="replace")
+                        raise TransferError(f"status {resp.status_code}: {body[:200]}")
+
+                    resp_etag = resp.headers.get("ETag")
+                    if offset and (resp.status_code != 206 or resp_etag != etag):
+                        # Object changed or Range was ignored: discard the partial file.
+                        offset = 0
+                        if resp.status_code == 206:
+                            continue
+                    body_length = int(resp.headers.get("Content-Length") or 0) or None
+                    length = offset + body_length if body_length is not None else None
+                    etag = resp_etag
+                    if not offset:
+                        # Ranged responses may omit full-object checksums, so keep the first one.
+                        checksum = expected_checksum(resp.headers)
+                        encoding = content_encoding(resp.headers)
+                    _write_sidecar(sidecar, etag, length, offset, checksum, encoding)
+                    on_start(length, offset)
+
+                    if on_verified is not None and checksum is not None and (hasher is None or hasher.count != offset):
+                        if hasher is not None:
+                            hasher.close()
+                        hasher = StreamHasher(checksum[0])
+                        if offset:
+                            hasher.update_file(part, offset)
+                    with part.open("ab" if offset else "wb") as f:
+                        for chunk in resp.iter_raw(chunk_size=MIB):
+                            f.write(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                            offset += len(chunk)
+                            on_progress(len(chunk))
+                if length is None or offset >= length:
+                    break
+                # Body ended early without a transport error; resume from where it stopped.
+                attempt += 1
+                if attempt > MAX_RETRIES:
+                    raise TransferError(
+                        f"connection closed after {offset} of {length} bytes (partial download kept in {part})"
+                    )
+            except httpx.TransportError as e:
+                attempt += 1
+                if attempt > MAX_RETRIES:
+                    raise TransferError(f"{e} (partial download kept in {part})") from e
+                time.sleep(retry_delay(attempt - 1))
+                url = presign()
+    finally:
+        if hasher is not None:
+            hasher.close()
+        if part.exists() and not (length is not None and offset >= length):
+            _write_sidecar(sidecar, etag, length, offset, checksum, encoding)
+
+    if on_verified is not None:
+        if checksum is not None:
+            if hasher is not None and hasher.count == offset:
+                actual = hasher.hexdigest()
+            else:
+                # Nothing was streamed when the .part was already complete (416 on resume).
+                actual = file_digest(part, checksum[0])
+            try:
+                _verify_digest(actual, checksum, str(target))
+            except TransferError:
+                part.unlink(missing_ok=True)
+                sidecar.unlink(missing_ok=True)
+                raise
+        on_verified(checksum[0] if checksum is not None else None)
+    _finish_part(part, target, encoding if decompress else None)
+    sidecar.unlink(missing_ok=True)
+    on_etag(etag)
+
+
+def download_to_stream(
+    http: httpx.Client,
+    presign: Callable[[], str],
+    out: BinaryIO,
+    *,
+    on_progress: ProgressCallback = lambda n: None,
+    on_verified: VerifyCallback | None = None,
+    decompress: bool = False,
+) -> int:
+    """Stream an object into `out` (e.g. stdout). Returns the number of bytes received.
+
+    Nothing can be rewound once written, so after a dropped connection the transfer
+    continues with a Range request only if the server confirms the same ETag. With
+    `on_verified`, a checksum mismatch is reported as an error after the data was written.
+    With `decompress`, gzip/zstd-encoded objects are decompressed on the fly; a resumed
+    body simply continues feeding the same decompressor.
+    """
+    url = presign()
+    written = 0
+    etag: str | None = None
+    checksum: tuple[str, str] | None = None
+    hasher: StreamHasher | None = None
+    decompressor: _Decompressor | None = None
+    attempt = 0
+    while True:
+        headers = {"Range": f"bytes={written}-"} if written else {}
+        try:
+            with http.stream("GET", url, headers=headers) as resp:
+                if resp.status_code in (401, 403) and attempt < MAX_RETRIES:
+                    attempt += 1
+                    url = presign()
+                    continue
+                if resp.status_code >= 400:
+                    body = resp.read().decode(errors="replace")
+                    raise TransferError(f"status {resp.status_code}: {body[:200]}")
+                if written and (resp.status_code != 206 or resp.headers.get("ETag") != etag):
+                    raise TransferError(f"cannot resume after {written} bytes: object changed or Range unsupported")
+                etag = resp.headers.get("ETag")
+                if not written and on_verified is not None:
+                    checksum = expected_checksum(resp.headers)
+                    hasher = StreamHasher(checksum[0]) if checksum is not None else None
+                if not written and decompress and (encoding := content_encoding(resp.headers)):
+                    decompressor = _Decompressor(encoding)
+                for chunk in resp.iter_raw(chunk_size=MIB):
+                    out.write(decompressor.decompress(chunk) if decompressor is not None else chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    written += len(chunk)
+                    on_progress(len(chunk))
+            if decompressor is not None:
+                out.write(decompressor.flush())
+            out.flush()
+            if on_verified is not None:
+                if hasher is not None and checksum is not None:
+                    _verify_digest(hasher.hexdigest(), checksum, "stream")
+                on_verified(checksum[0] if checksum is not None else None)
+            return written
+        except httpx.TransportError as e:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                if hasher is not None:
+                    hasher.close()
+                raise TransferError(str(e)) from e
+            time.sleep(retry_delay(attempt - 1))
+            url = presign()
+
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/")
+
+
+def read_range(
+    http: httpx.Client,
+    presign: Callable[[], str],
+    out: BinaryIO,
+    *,
+    offset: int,
+    length: int | None = None,
+) -> int:
+    """Write `length` bytes of an object starting at `offset` to `out`. Returns the bytes written.
+
+    A negative `offset` counts from the end (`tail -c`). Only those bytes are fetched
+    when the server honours Range; otherwise the body is skipped up to the offset and the
+    connection dropped once `length` bytes are out. An interrupted read continues from
+    the last byte written, provided the ETag is unchanged. Bytes are returned as stored.
+    """
+    if length == 0:
+        return 0
+    url = presign()
+    written = 0
+    # Absolute position of the first byte and of the last one (inclusive), once known.
+    first: int | None = offset if offset >= 0 else None
+    last: int | None = offset + length - 1 if offset >= 0 and length else None
+    etag: str | None = None
+    attempt = 0
+    while True:
+        if first is None:
+            byte_range = f"bytes={offset}"
+        else:
+            byte_range = f"bytes={first + written}-{'' if last is None else last}"
+        try:
+            with http.stream("GET", url, headers={"Range": byte_range}) as resp:
+                if resp.status_code in (401, 403) and attempt < MAX_RETRIES:
+                    attempt += 1
+                    url = presign()
+                    continue
+                if resp.status_code == 416:
+                    # Offset past the end (or an empty object): nothing to write.
+                    return written
+                if resp.status_code >= 400:
+                    body = resp.read().decode(errors="replace")
+                    raise TransferError(f"status {resp.status_code}: {body[:200]}")
+                if written and resp.headers.get("ETag") != etag:
+                    raise TransferError(f"object changed after {written} bytes")
+                etag = resp.headers.get("ETag")
+                skip = 0
+                if resp.status_code == 206 and (match := _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))):
+                    first, last = int(match[1]) - written, int(match[2])
+                else:
+                    # Range ignored: the whole body follows.
+                    if first is None:
+                        first = max(0, int(resp.headers.get("Content-Length") or 0) + offset)
+                    skip = first + written
+                remaining = None if last is None else last - first - written + 1
+                for chunk in resp.iter_raw(chunk_size=MIB):
+                    if skip:
+                        if len(chunk) <= skip:
+                            skip -= len(chunk)
+                            continue
+                        chunk, skip = chunk[skip:], 0
+                    if remaining is not None:
+                        chunk = chunk[:remaining]
+                        remaining -= len(chunk)
+                    out.write(chunk)
+                    written += len(chunk)
+                    if remaining == 0:
+                        break
+            out.flush()
+            return written
+        except httpx.TransportError as e:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise TransferError(str(e)) from e
+            time.sleep(retry_delay(attempt - 1))
+            url = presign()
+
+
+# ── segmented download ────────────────────────────────────────────────
+
+
+MIN_SEGMENT_SIZE = 8 * MIB
+
+
+class _SharedUrl:
+    """A pre-signed URL shared by worker threads; the first worker to see it expire refreshes it."""
+
+    def __init__(self, presign: Callable[[], str]) -> None:
+        self._presign = presign
+        self._lock = threading.Lock()
+        self.url = presign()
+
+    def refresh(self, stale: str) -> str:
+        with self._lock:
+            if self.url == stale:
+                self.url = self._presign()
+            return self.url
+
+
+def _probe_length(http: httpx.Client, url: str) -> tuple[int, httpx.Headers] | None:
+    """Return (length, response headers) if the server honours Range requests, else None.
+
+    A one-byte ranged GET is used rather than HEAD: pre-signed URLs are signed for GET only.
+    """
+    with http.stream("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+        if resp.status_code != 206:
+            return None
+        content_range = resp.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        if not total.isdigit():
+            return None
+        return int(total), resp.headers
+
+
+def etag_matches(http: httpx.Client, url: str, etag: str) -> bool:
+    """True if the object still has `etag`: a conditional one-byte GET answered 304 Not Modified."""
+    try:
+        with http.stream("GET", url, headers={"Range": "bytes=0-0", "If-None-Match": etag}) as resp:
+            return resp.status_code == 304
+    except httpx.TransportError:
+        return False
+
+
+def _fetch_segment(
+    http: httpx.Client,
+    shared: _SharedUrl,
+    write: Callable[[bytes, int], Any],
+    start: int,
+    end: int,
+    etag: str | None,
+    on_progress: ProgressCallback,
+) -> None:
+    pos = start
+    attempt = 0
+    while pos <= end:
+        url = shared.url
+        try:
+            with http.stream("GET", url, headers={"Range": f"bytes={pos}-{end}"}) as resp:
+                if resp.status_code in (401, 403) and attempt < MAX_RETRIES:
+                    attempt += 1
+                    shared.refresh(url)
+                    continue
+                if resp.status_code != 206:
+                    raise TransferError(f"segment {start}-{end}: unexpected status {resp.status_code}")
+                if etag and resp.headers.get("ETag") != etag:
+                    raise TransferError("object changed during download")
+                for chunk in resp.iter_raw(chunk_size=MIB):
+                    write(chunk, pos)
+                    pos += len(chunk)
+                    on_progress(len(chunk))
+            if pos > end:
+                break
+            # Body ended early without a transport error; resume from where it stopped.
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise TransferError(f"segment {start}-{end}: connection closed after {pos - start} bytes")
+            time.sleep(retry_delay(attempt - 1))
+        except httpx.TransportError as e:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise TransferError(f"segment {start}-{end}: {e}") from e
+            time.sleep(retry_delay(attempt - 1))
+
+
+def download_segmented(
+    http: httpx.Client,
+    presign: Callable[[], str],
+    target: Path,
+    *,
+    segments: int,
+    on_start: Callable[[int | None, int], None] = lambda total, offset: None,
+    on_progress: ProgressCallback = lambda n: None,
+    on_verified: VerifyCallback | None = None,
+    decompress: bool = False,
+    on_etag: Callable[[str | None], None] = lambda etag: None,
+) -> bool:
+    """Download `target` as `segments` byte ranges fetched concurrently into a preallocated file.
+
+    Each range is written in place with `os.pwrite` and retried from its own last
+    position. Returns False without writing anything if the server ignores Range, so
+    the caller can fall back to a single stream. Segments arrive out of order, so with
+    `on_verified` the finished file is hashed once before the rename.
+    """
+    shared = _SharedUrl(presign)
+    probe = _probe_length(http, shared.url)
+    if probe is None:
+        return False
+    total, probe_headers = probe
+    etag = probe_headers.get("ETag")
+
+    count = max(1, min(segments, total // MIN_SEGMENT_SIZE or 1))
+    step = -(-total // count) if total else 0
+    ranges = [(start, min(start + step, total) - 1) for start in range(0, total, step or 1)]
+
+    part, sidecar = part_paths(target)
+    sidecar.unlink(missing_ok=True)
+    on_start(total, 0)
+    fd = os.open(part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            os.ftruncate(fd, total)
+            run_parallel(
+                lambda rng: _fetch_segment(
+                    http, shared, lambda chunk, pos: os.pwrite(fd, chunk, pos), rng[0], rng[1], etag, on_progress
+                ),
+                ranges,
+                count,
+            )
+        finally:
+            os.close(fd)
+        if on_verified is not None:
+            checksum = expected_checksum(probe_headers)
+            if checksum is not None:
+                _verify_digest(file_digest(part, checksum[0]), checksum, str(target))
+            on_verified(checksum[0] if checksum is not None else None)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    _finish_part(part, target, content_encoding(probe_headers) if decompress else None)
+    on_etag(etag)
+    return True
+
+
+# ── copy ──────────────────────────────────────────────────────────────
+
+
+def _object_metadata(headers: httpx.Headers) -> dict[str, Any]:
+    """Upload metadata that carries the source object's Content-Type/-Encoding over to a copy."""
+    metadata: dict[str, Any] = {}
+    if content_type := headers.get("Content-Type"):
+        metadata["ContentType"] = content_type
+    if encoding := headers.get("Content-Encoding"):
+        metadata["ContentEncoding"] = encoding
+    return metadata
+
+
+def _pipe_object(
+    http: httpx.Client,
+    source: _SharedUrl,
+    destination: Callable[[dict[str, Any]], str],
+    on_progress: ProgressCallback,
+) -> int:
+    """Stream a GET response straight into a PUT to `destination(metadata)`. Returns the size.
+
+    Chunks are handed from one connection to the other as they arrive, so only one chunk
+    is held in memory at a time. A failure restarts the object from the beginning.
+    """
+    last_error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        sent = 0
+        retryable = True
+        url = source.url
+        try:
+            with http.stream("GET", url) as resp:
+                if resp.status_code in (401, 403) and attempt < MAX_RETRIES:
+                    source.refresh(url)
+                    continue
+                if resp.status_code >= 400:
+                    raise TransferError(f"source: status {resp.status_code}")
+                length = resp.headers.get("Content-Length")
+                if length is None:
+                    raise TransferError("source did not report its size")
+                metadata = _object_metadata(resp.headers)
+                headers = {"Content-Length": length}
+                if "ContentType" in metadata:
+                    headers["Content-Type"] = metadata["ContentType"]
+                if "ContentEncoding" in metadata:
+                    headers["Content-Encoding"] = metadata["ContentEncoding"]
+
+                def body() -> Iterator[bytes]:
+                    nonlocal sent
+                    # Raw bytes: a compressed object is copied as stored, not decoded.
+                    for chunk in resp.iter_raw(chunk_size=MIB):
+                        sent += len(chunk)
+                        on_progress(len(chunk))
+                        yield chunk
+
+                put = http.put(destination(metadata), content=body(), headers=headers)
+        except httpx.TransportError as e:
+            last_error = str(e)
+        else:
+            if put.status_code < 400:
+                return int(length)
+            last_error = f"status {put.status_code}: {put.text[:200]}"
+            retryable = put.status_code >= 500 or put.status_code in (401, 403, 408, 429)
+        on_progress(-sent)
+        if not retryable:
+            break
+        if attempt < MAX_RETRIES:
+            time.sleep(retry_delay(attempt))
+    raise TransferError(last_error)
+
+
+def copy_object(
+    client,
+    http: httpx.Client,
+    bucket: str,
+    key: str,
+    source: Callable[[], str],
+    destination: Callable[[dict[str, Any]], str],
+    *,
+    size: int | None = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    on_progress: ProgressCallback = lambda n: None,
+) -> int:
+    """Copy the object behind the pre-signed GET URL `source()` to `bucket`/`key` without touching disk.
+
+    Objects up to one part are piped from the GET into a single PUT to
+    `destination(metadata)`. Larger ones (if the source honours Range) become a multipart
+    upload whose parts are fetched as byte ranges and uploaded `workers` at a time, so at
+    most `workers` parts are buffered in memory. `size`, when known from a listing, saves
+    the probe request for small objects. Returns the number of bytes copied.
+    """
+    part_size = max(part_size, MIN_PART_SIZE)
+    shared = _SharedUrl(source)
+    probe = _probe_length(http, shared.url) if size is None or size > part_size else None
+    if probe is None or probe[0] <= part_size:
+        return _pipe_object(http, shared, destination, on_progress)
+
+    total, headers = probe
+    etag = headers.get("ETag")
+    upload_id = _start_multipart(client, bucket, key, _object_metadata(headers))
+    if upload_id is None:
+        return _pipe_object(http, shared, destination, on_progress)
+
+    def copy_part(number: int) -> dict[str, Any]:
+        start = (number - 1) * part_size
+        chunks: list[bytes] = []
+        # _fetch_segment resumes from the last received byte, so chunks arrive in order.
+        _fetch_segment(
+            http, shared, lambda chunk, pos: chunks.append(chunk), start, min(start + part_size, total) - 1, etag,
+            lambda n: None,
+        )
+        data = b"".join(chunks)
+        chunks.clear()
+        part_etag = _put_part(
+            http, _presign_part(client, bucket, key, upload_id, number), data, on_progress,
+            refresh=lambda: _presign_part(client, bucket, key, upload_id, number),
+        )
+        return {"part_number": number, "etag": part_etag}
+
+    part_numbers = list(range(1, -(-total // part_size) + 1))
+    _finish_multipart(client, bucket, key, upload_id, lambda: run_parallel(copy_part, part_numbers, workers))
+    return total
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from novps.config import CACHE_DIR
+
+# Pre-signed download URLs issued by the API, kept until shortly before they expire so
+# repeated transfers of the same key skip the presign round-trip. Expiry is read from the
+# URL's own signature parameters; URLs without a recognisable expiry are never cached.
+
+REUSE_MARGIN = 300  # seconds a cached URL must still be valid for to be handed out (at most 1/4 of its lifetime)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (bucket, key, duration)
+) WITHOUT ROWID;
+"""
+
+
+def url_expiry(url: str) -> float | None:
+    """UNIX time a pre-signed URL stops working, from SigV4 (X-Amz-Date + X-Amz-Expires) or `Expires`."""
+    query = {k.lower(): v[0] for k, v in parse_qs(urlsplit(url).query).items()}
+    for vendor in ("amz", "goog"):
+        signed_at, lifetime = query.get(f"x-{vendor}-date"), query.get(f"x-{vendor}-expires")
+        if signed_at and lifetime and lifetime.isdigit():
+            try:
+                start = datetime.strptime(signed_at, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+            except ValueError:
+                return None
+            return start.timestamp() + int(lifetime)
+    expires = query.get("expires")
+    if expires and expires.isdigit():
+        return float(expires)
+    return None
+
+
+class UrlCache:
+    """Per-project SQLite store of pre-signed download URLs. Safe to share between threads."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fresh = not path.exists()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if fresh:
+            # Pre-signed URLs grant access to the objects; keep them private like the config file.
+            os.chmod(path, 0o600)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.execute("DELETE FROM urls WHERE expires_at < ?", (time.time(),))
+
+    @classmethod
+    def for_project(cls, project: str) -> UrlCache:
+        return cls(CACHE_DIR / "urls" / f"{project}.sqlite3")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def get(self, bucket: str, key: str, duration: int | None) -> tuple[str, float] | None:
+        """A cached (url, expires_at) that stays valid for a while longer, if any."""
+        margin = min(REUSE_MARGIN, duration / 4) if duration else REUSE_MARGIN
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, expires_at FROM urls WHERE bucket = ? AND key = ? AND duration = ? AND expires_at > ?",
+                (bucket, key, duration or 0, time.time() + margin),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, bucket: str, key: str, duration: int | None, url: str) -> float | None:
+        """Remember `url` and return its expiry, or None (and don't cache) if it can't be determined."""
+        expires_at = url_expiry(url)
+        if expires_at is None:
+            return None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (bucket, key, duration, url, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (bucket, key, duration or 0, url, expires_at),
+            )
+        return expires_at